@@ -1,9 +1,13 @@
 import os
 import json
+import functools
+import shutil
 import tempfile
 import logging
 import struct
 import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Any, Dict, Tuple
 
 import numpy as np
@@ -25,5 +29,21 @@ except ImportError:
     TRIMESH_AVAILABLE = False
     trimesh = None
 
+# 导入numba用于数值内核加速（可选）
+try:
+    import numba
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    numba = None
+
 # 配置日志
-logger = logging.getLogger('glb_point_cloud_processor') 
\ No newline at end of file
+logger = logging.getLogger('glb_point_cloud_processor')
+
+
+@functools.lru_cache(maxsize=1)
+def cached_output_directory() -> str:
+    """获取ComfyUI输出目录（进程内只解析一次）"""
+    if FOLDER_PATHS_AVAILABLE:
+        return folder_paths.get_output_directory()
+    return "output"
\ No newline at end of file
@@ -1,5 +1,56 @@
 from .common import *
 
+# numpy回退路径的分块大小（32768点 × RGBA ≈ 128KB，可驻留L2缓存）
+_DARK_MASK_TILE = 32768
+
+
+if NUMBA_AVAILABLE:
+    @numba.njit(parallel=True, fastmath=True, cache=True)
+    def _dark_mask_int(colors, threshold, keep_mask):
+        """整数颜色的暗色点掩码内核：单次遍历计算RGB总和并写入keep_mask"""
+        for i in numba.prange(colors.shape[0]):
+            rgb_sum = np.int32(colors[i, 0]) + np.int32(colors[i, 1]) + np.int32(colors[i, 2])
+            keep_mask[i] = rgb_sum >= threshold
+
+    @numba.njit(parallel=True, fastmath=True, cache=True)
+    def _dark_mask_float(colors, threshold, keep_mask):
+        """浮点颜色的暗色点掩码内核"""
+        for i in numba.prange(colors.shape[0]):
+            keep_mask[i] = (colors[i, 0] + colors[i, 1] + colors[i, 2]) >= threshold
+
+    @numba.njit(cache=True)
+    def _compact_points(vertices, colors, keep_mask, out_vertices, out_colors):
+        """按掩码同时压缩顶点和颜色，两者在同一次遍历中流式写出"""
+        j = 0
+        for i in range(keep_mask.shape[0]):
+            if keep_mask[i]:
+                out_vertices[j, :] = vertices[i, :]
+                out_colors[j, :] = colors[i, :]
+                j += 1
+
+    def _warm_up_numba_kernels():
+        """以最小输入调用各内核，触发编译或加载编译缓存"""
+        _dark_mask_int(np.zeros((1, 4), dtype=np.uint8), 0, np.ones(1, dtype=bool))
+        _compact_points(np.zeros((1, 3)), np.zeros((1, 4), dtype=np.uint8), np.ones(1, dtype=bool),
+                        np.empty((1, 3)), np.empty((1, 4), dtype=np.uint8))
+
+
+# numba内核在首次使用时才预热，不拖慢节点导入（cache=True时直接加载磁盘上的编译缓存）；None表示尚未预热
+_NUMBA_KERNELS_READY = None if NUMBA_AVAILABLE else False
+
+
+def _numba_kernels_ready():
+    """首次调用时预热numba内核并记录结果，返回内核是否可用；编译失败时回退到numpy实现"""
+    global _NUMBA_KERNELS_READY
+    if _NUMBA_KERNELS_READY is None:
+        try:
+            _warm_up_numba_kernels()
+            _NUMBA_KERNELS_READY = True
+        except Exception as e:
+            logger.warning(f"numba内核编译失败，回退到numpy实现: {e}")
+            _NUMBA_KERNELS_READY = False
+    return _NUMBA_KERNELS_READY
+
 class GLBPointCloudBlackDelete:
     """GLB点云文件处理器 - 专门用于删除黑色点和暗色点优化"""
 
@@ -45,198 +96,184 @@ class GLBPointCloudBlackDelete:
         处理GLB点云文件，删除黑色点和暗色点
         """
         
-        processing_log = []
-        processing_log.append("开始GLB点云黑色点清理...")
+        logger.debug("开始GLB点云黑色点清理...")
         
         # 检查依赖
         if not TRIMESH_AVAILABLE:
             error_msg = "trimesh库不可用，无法处理GLB文件"
             logger.error(error_msg)
-            processing_log.append(f"错误: {error_msg}")
             return ("",)
         
         # 验证输入文件路径
         if not glb_file_path or not glb_file_path.strip():
             error_msg = "GLB文件路径为空"
             logger.error(error_msg)
-            processing_log.append(f"错误: {error_msg}")
             return ("",)
         
         # 处理文件路径
         input_path = self._resolve_file_path(glb_file_path.strip())
-        processing_log.append(f"输入文件路径: {input_path}")
+        logger.debug("输入文件路径: %s", input_path)
         
         if not os.path.exists(input_path):
             error_msg = f"GLB文件不存在: {input_path}"
             logger.error(error_msg)
-            processing_log.append(f"错误: {error_msg}")
             return ("",)
         
         try:
             # 加载GLB文件
-            processing_log.append("正在加载GLB文件...")
-            scene = trimesh.load(input_path)
+            logger.debug("正在加载GLB文件...")
+            # 只读取点云顶点和颜色，跳过网格合并顶点等预处理
+            scene = trimesh.load(input_path, process=False)
+            is_scene = isinstance(scene, trimesh.Scene)
+            geometry_map = scene.geometry if is_scene else None
             
             # 提取点云数据
             point_clouds = []
             other_geometries = []
             
-            if isinstance(scene, trimesh.Scene):
-                for name, geometry in scene.geometry.items():
+            if is_scene:
+                for name, geometry in geometry_map.items():
                     if isinstance(geometry, trimesh.PointCloud):
                         point_clouds.append((name, geometry))
-                        processing_log.append(f"发现点云: {name}, 点数: {len(geometry.vertices)}")
+                        logger.debug("发现点云: %s, 点数: %d", name, len(geometry.vertices))
                     else:
                         other_geometries.append((name, geometry))
-                        processing_log.append(f"发现其他几何体: {name}, 类型: {type(geometry).__name__}")
+                        logger.debug("发现其他几何体: %s, 类型: %s", name, type(geometry).__name__)
             elif isinstance(scene, trimesh.PointCloud):
                 point_clouds.append(("main_pointcloud", scene))
-                processing_log.append(f"发现点云: main_pointcloud, 点数: {len(scene.vertices)}")
+                logger.debug("发现点云: main_pointcloud, 点数: %d", len(scene.vertices))
             else:
                 # 尝试转换为点云
                 if hasattr(scene, 'vertices'):
                     pc = trimesh.PointCloud(vertices=scene.vertices, colors=getattr(scene.visual, 'vertex_colors', None))
                     point_clouds.append(("converted_pointcloud", pc))
-                    processing_log.append(f"转换为点云: converted_pointcloud, 点数: {len(pc.vertices)}")
+                    logger.debug("转换为点云: converted_pointcloud, 点数: %d", len(pc.vertices))
                 else:
                     error_msg = "GLB文件中未找到点云数据"
-                    processing_log.append(f"错误: {error_msg}")
+                    logger.error(error_msg)
                     return ("",)
             
             if not point_clouds:
                 error_msg = "GLB文件中没有点云数据"
-                processing_log.append(f"错误: {error_msg}")
+                logger.error(error_msg)
                 return ("",)
             
-            # 处理每个点云
+            # 提取每个点云的顶点和颜色（只读，不复制；掩码索引时才产生新数组）
+            cloud_arrays = []
+            for name, point_cloud in point_clouds:
+                colors = None
+                if hasattr(point_cloud.visual, 'vertex_colors') and point_cloud.visual.vertex_colors is not None:
+                    colors = point_cloud.visual.vertex_colors
+                elif hasattr(point_cloud, 'colors') and point_cloud.colors is not None:
+                    colors = point_cloud.colors
+                if colors is None:
+                    logger.debug("跳过黑色点过滤: 点云 %s 无颜色信息", name)
+                cloud_arrays.append((point_cloud.vertices, colors))
+            
+            # 各点云相互独立，numpy路径会释放GIL，多个点云时并行过滤；
+            # numba内核自身已多核并行，且默认线程层不支持并发调用，此时串行执行
+            max_workers = 1 if _numba_kernels_ready() else min(8, len(cloud_arrays))
+            if max_workers > 1:
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    filtered_results = list(executor.map(
+                        lambda arrays: self._filter_point_cloud(arrays[0], arrays[1], black_threshold),
+                        cloud_arrays))
+            else:
+                filtered_results = [self._filter_point_cloud(vertices, colors, black_threshold)
+                                    for vertices, colors in cloud_arrays]
+            
+            # 处理每个点云（修改trimesh对象不是线程安全的，串行执行）
             processed_point_clouds = []
             total_original_points = 0
             total_removed_points = 0
             
-            for name, point_cloud in point_clouds:
-                processing_log.append(f"\n处理点云: {name}")
+            for (name, point_cloud), (filtered_vertices, filtered_colors) in zip(point_clouds, filtered_results):
                 original_count = len(point_cloud.vertices)
                 total_original_points += original_count
                 
-                # 获取原始点云的所有属性和状态
-                original_vertices = point_cloud.vertices.copy()
-                colors = None
-                
-                # 获取颜色信息
-                if hasattr(point_cloud.visual, 'vertex_colors') and point_cloud.visual.vertex_colors is not None:
-                    colors = point_cloud.visual.vertex_colors.copy()
-                elif hasattr(point_cloud, 'colors') and point_cloud.colors is not None:
-                    colors = point_cloud.colors.copy()
-                
-                # 初始化掩码（所有点都保留）
-                keep_mask = np.ones(len(original_vertices), dtype=bool)
-                
-                # 删除暗色点（仅基于颜色，不改变顶点坐标）
-                if colors is not None:
-                    removed_count = self._remove_dark_points(original_vertices, colors, keep_mask, black_threshold, processing_log)
-                    processing_log.append(f"删除黑色点: {removed_count} 个")
-                else:
-                    processing_log.append("跳过黑色点过滤: 点云无颜色信息")
-                
-                # 应用掩码，保留原始的顶点坐标
-                filtered_vertices = original_vertices[keep_mask]
-                filtered_colors = colors[keep_mask] if colors is not None else None
-                
                 remaining_count = len(filtered_vertices)
                 removed_count = original_count - remaining_count
                 total_removed_points += removed_count
                 
-                processing_log.append(f"点云 {name}: 原始 {original_count} -> 剩余 {remaining_count} (删除 {removed_count})")
+                logger.debug("点云 %s: 原始 %d -> 剩余 %d (删除 %d)", name, original_count, remaining_count, removed_count)
                 
-                # 创建处理后的点云，保留所有原始属性
+                # 记录过滤结果，稍后直接写回原始点云，保留所有原始属性
                 if remaining_count > 0:
-                    # 使用原始点云作为模板，只更新顶点和颜色
-                    processed_pc = point_cloud.copy()
-                    processed_pc.vertices = filtered_vertices
-                    if filtered_colors is not None:
-                        processed_pc.visual.vertex_colors = filtered_colors
-                    
-                    processed_point_clouds.append((name, processed_pc))
-                    processing_log.append(f"保留点云 {name} 的所有原始属性和状态")
+                    processed_point_clouds.append((name, point_cloud, filtered_vertices, filtered_colors))
                 else:
-                    processing_log.append(f"警告: 点云 {name} 处理后没有剩余点")
+                    logger.warning("点云 %s 处理后没有剩余点", name)
+            
+            # 没有删除任何点时，输出与输入完全一致，直接复制文件跳过GLB重新编码
+            if processed_point_clouds and total_removed_points == 0 and input_path.lower().endswith('.glb'):
+                output_path = self._generate_output_path(output_filename)
+                if os.path.abspath(output_path) != os.path.abspath(input_path):
+                    shutil.copyfile(input_path, output_path)
+                logger.debug("未删除任何点，直接复制输入文件: %s", output_path)
+                return (output_path,)
             
             # 直接修改原始场景，保持所有几何信息不变
             if processed_point_clouds:
                 # 使用原始场景作为基础，直接替换点云数据
                 new_scene = scene
                 
-                # 直接修改原始场景中的点云几何体，保持变换不变
-                for name, processed_pc in processed_point_clouds:
-                    if isinstance(scene, trimesh.Scene):
-                        # 获取原始几何体
-                        if name in scene.geometry:
-                            original_geometry = scene.geometry[name]
-                            
-                            # 如果是点云，直接修改顶点和颜色
-                            if isinstance(original_geometry, trimesh.PointCloud):
-                                original_geometry.vertices = processed_pc.vertices
-                                if hasattr(processed_pc.visual, 'vertex_colors') and processed_pc.visual.vertex_colors is not None:
-                                    original_geometry.visual.vertex_colors = processed_pc.visual.vertex_colors
-                                
-                                processing_log.append(f"直接修改原始点云 {name}，保持所有变换和属性不变")
-                            else:
-                                # 如果不是点云类型，替换整个几何体但保持变换
-                                scene.delete_geometry(name)
-                                scene.add_geometry(processed_pc, node_name=name)
-                                processing_log.append(f"替换几何体 {name}，尝试保持变换")
-                        else:
-                            # 新增几何体
-                            scene.add_geometry(processed_pc, node_name=name)
-                            processing_log.append(f"添加新点云 {name}")
+                # 直接修改原始点云几何体的顶点和颜色，保持变换不变
+                for name, point_cloud, filtered_vertices, filtered_colors in processed_point_clouds:
+                    if is_scene:
+                        geometry = geometry_map[name]
+                        logger.debug("直接修改原始点云 %s，保持所有变换和属性不变", name)
                     else:
                         # 单个几何体的情况
-                        new_scene = processed_pc
-                        processing_log.append("单个几何体，直接使用处理后的点云")
+                        geometry = point_cloud
+                        new_scene = point_cloud
+                        logger.debug("单个几何体，直接使用处理后的点云")
+                    
+                    geometry.vertices = filtered_vertices
+                    if filtered_colors is not None:
+                        geometry.visual.vertex_colors = filtered_colors
                 
-                processing_log.append("直接修改原始场景，所有变换矩阵和几何属性完全保持不变")
+                logger.debug("直接修改原始场景，所有变换矩阵和几何属性完全保持不变")
                 
                 # 生成输出路径
                 output_path = self._generate_output_path(output_filename)
-                processing_log.append(f"输出文件路径: {output_path}")
+                logger.debug("输出文件路径: %s", output_path)
                 
                 # 保存处理后的GLB文件
-                processing_log.append("正在保存处理后的GLB文件...")
+                logger.debug("正在保存处理后的GLB文件...")
                 new_scene.export(output_path)
                 
                 # 验证文件是否保存成功
                 if os.path.exists(output_path):
                     file_size = os.path.getsize(output_path)
-                    processing_log.append(f"GLB文件保存成功，文件大小: {file_size} bytes")
+                    logger.debug("GLB文件保存成功，文件大小: %d bytes", file_size)
                     
-                    # 验证输出文件的一致性
-                    try:
-                        # 加载输出文件进行验证
-                        verification_scene = trimesh.load(output_path)
-                        processing_log.append("文件验证: 输出文件可正常加载")
-                        
-                        # 检查是否保留了场景结构
-                        if isinstance(scene, trimesh.Scene) and isinstance(verification_scene, trimesh.Scene):
-                            processing_log.append(f"场景结构验证: 原始 {len(scene.geometry)} 个对象 -> 输出 {len(verification_scene.geometry)} 个对象")
-                        
-                    except Exception as e:
-                        processing_log.append(f"文件验证警告: {str(e)}")
+                    # 验证输出文件的一致性（需要重新解析整个文件，结果只写入调试日志，仅在启用DEBUG日志时执行）
+                    if logger.isEnabledFor(logging.DEBUG):
+                        try:
+                            # 加载输出文件进行验证
+                            verification_scene = trimesh.load(output_path)
+                            logger.debug("文件验证: 输出文件可正常加载")
+                            
+                            # 检查是否保留了场景结构
+                            if isinstance(scene, trimesh.Scene) and isinstance(verification_scene, trimesh.Scene):
+                                logger.debug("场景结构验证: 原始 %d 个对象 -> 输出 %d 个对象", len(scene.geometry), len(verification_scene.geometry))
+                            
+                        except Exception as e:
+                            logger.warning("文件验证警告: %s", e)
                     
-                    processing_log.append("GLB点云黑色点清理完成! 已保留原始模型的大小、朝向和几何属性")
+                    logger.debug("GLB点云黑色点清理完成! 已保留原始模型的大小、朝向和几何属性")
                     return (output_path,)
                 else:
                     error_msg = "GLB文件保存失败"
-                    processing_log.append(f"错误: {error_msg}")
+                    logger.error(error_msg)
                     return ("",)
             else:
                 error_msg = "处理后没有剩余的点云数据"
-                processing_log.append(f"错误: {error_msg}")
+                logger.error(error_msg)
                 return ("",)
                 
         except Exception as e:
             error_msg = f"处理GLB文件时发生错误: {str(e)}"
             logger.error(error_msg)
-            processing_log.append(f"错误: {error_msg}")
             import traceback
             traceback.print_exc()
             return ("",)
@@ -248,8 +285,7 @@ class GLBPointCloudBlackDelete:
         
         # 尝试相对于ComfyUI输出目录
         if FOLDER_PATHS_AVAILABLE:
-            output_dir = folder_paths.get_output_directory()
-            candidate_path = os.path.join(output_dir, file_path)
+            candidate_path = os.path.join(cached_output_directory(), file_path)
             if os.path.exists(candidate_path):
                 return candidate_path
         
@@ -262,10 +298,7 @@ class GLBPointCloudBlackDelete:
     
     def _generate_output_path(self, filename: str) -> str:
         """生成输出文件路径"""
-        if FOLDER_PATHS_AVAILABLE:
-            output_dir = folder_paths.get_output_directory()
-        else:
-            output_dir = "output"
+        output_dir = cached_output_directory()
         
         # 确保输出目录存在
         os.makedirs(output_dir, exist_ok=True)
@@ -276,35 +309,72 @@ class GLBPointCloudBlackDelete:
         
         return os.path.join(output_dir, filename)
     
-    def _remove_dark_points(self, vertices: np.ndarray, colors: np.ndarray, keep_mask: np.ndarray, 
-                           black_threshold: int, processing_log: List[str]) -> int:
-        """删除暗色点"""
+    def _filter_point_cloud(self, vertices: np.ndarray, colors, black_threshold: int):
+        """对单个点云构建保留掩码并压缩顶点和颜色（仅基于颜色，不改变顶点坐标）"""
+        keep_mask = np.ones(len(vertices), dtype=bool)
         removed_count = 0
+        if colors is not None:
+            removed_count = self._remove_dark_points(vertices, colors, keep_mask, black_threshold)
+        # 保留点数由删除计数推得，不再对掩码重复计数
+        return self._apply_keep_mask(vertices, colors, keep_mask, len(vertices) - removed_count)
+    
+    def _apply_keep_mask(self, vertices: np.ndarray, colors, keep_mask: np.ndarray, keep_count: int):
+        """按掩码压缩顶点和颜色，输出缓冲区按保留点数一次性预分配"""
+        out_vertices = np.empty((keep_count, vertices.shape[1]), dtype=vertices.dtype)
         
-        # 确保颜色数据格式正确
-        if colors.shape[1] == 4:  # RGBA
-            rgb_colors = colors[:, :3]
-        else:  # RGB
-            rgb_colors = colors
+        if colors is None:
+            np.compress(keep_mask, vertices, axis=0, out=out_vertices)
+            return out_vertices, None
         
-        # 如果颜色值在0-1范围内，转换为0-255
-        if rgb_colors.max() <= 1.0:
-            rgb_colors = (rgb_colors * 255).astype(np.uint8)
+        out_colors = np.empty((keep_count, colors.shape[1]), dtype=colors.dtype)
+        if _numba_kernels_ready():
+            _compact_points(vertices, colors, keep_mask, out_vertices, out_colors)
         else:
-            rgb_colors = rgb_colors.astype(np.uint8)
+            np.compress(keep_mask, vertices, axis=0, out=out_vertices)
+            np.compress(keep_mask, colors, axis=0, out=out_colors)
+        return out_vertices, out_colors
+    
+    def _remove_dark_points(self, vertices: np.ndarray, colors: np.ndarray, keep_mask: np.ndarray, 
+                           black_threshold: int) -> int:
+        """删除暗色点
+
+        keep_mask 需为全True的初始掩码，结果直接写入其中
+        """
+        # 阈值为0时不删除任何点，跳过颜色求和
+        if black_threshold <= 0:
+            return 0
         
-        # 计算RGB总和
-        rgb_sum = rgb_colors.sum(axis=1)
+        # 按数据类型确定阈值量纲（常数时间判断，无需对颜色求max）
+        integer_colors = colors.dtype.kind in 'ui'
+        if integer_colors:
+            threshold = black_threshold
+        else:
+            # 浮点颜色为0-1范围，缩放阈值而不是缩放颜色
+            threshold = black_threshold / 255.0
+
+        # 应用黑色阈值过滤：比较结果直接写入keep_mask，只做一次计数
+        if _numba_kernels_ready():
+            # numba内核直接读取原始颜色数组的前三列，单次遍历完成求和与比较
+            if integer_colors:
+                _dark_mask_int(colors, threshold, keep_mask)
+            else:
+                _dark_mask_float(colors, float(threshold), keep_mask)
+        else:
+            # 分块处理，使每块的求和与比较在缓存内完成；按R、G、B列依次累加到
+            # 复用的求和缓冲区（RGB与RGBA通用，无需切出RGB子数组）
+            # 整数颜色使用uint16累加（最大765，不会溢出）
+            sum_dtype = np.uint16 if integer_colors else np.float32
+            sum_buffer = np.empty(min(len(keep_mask), _DARK_MASK_TILE), dtype=sum_dtype)
+            for start in range(0, len(keep_mask), _DARK_MASK_TILE):
+                tile = colors[start:start + _DARK_MASK_TILE]
+                rgb_sum = sum_buffer[:len(tile)]
+                np.copyto(rgb_sum, tile[:, 0])
+                rgb_sum += tile[:, 1]
+                rgb_sum += tile[:, 2]
+                np.greater_equal(rgb_sum, threshold, out=keep_mask[start:start + _DARK_MASK_TILE])
         
-        # 应用黑色阈值过滤
-        if black_threshold > 0:
-            dark_mask = rgb_sum >= black_threshold
-            before_count = keep_mask.sum()
-            keep_mask &= dark_mask
-            after_count = keep_mask.sum()
-            removed_by_black = before_count - after_count
-            removed_count += removed_by_black
-            processing_log.append(f"  按RGB总和阈值({black_threshold})删除: {removed_by_black} 个点")
+        removed_count = len(keep_mask) - int(np.count_nonzero(keep_mask))
+        logger.debug("  按RGB总和阈值(%d)删除: %d 个点", black_threshold, removed_count)
         
         return removed_count
     
@@ -1,4 +1,28 @@
 from .common import *
+from .visualization_kernels import *
+
+# 包围盒的12条边（顶点索引对）
+_BOX_EDGES = np.array([
+    [0, 1], [1, 2], [2, 3], [3, 0],  # 底面
+    [4, 5], [5, 6], [6, 7], [7, 4],  # 顶面
+    [0, 4], [1, 5], [2, 6], [3, 7],  # 垂直边
+], dtype=np.intp)
+
+# 包围盒6个面的顶点索引（底、顶、前、后、左、右）
+_FACE_GROUPS = np.array([
+    [0, 1, 2, 3], [4, 5, 6, 7],
+    [0, 1, 4, 5], [2, 3, 6, 7],
+    [0, 3, 4, 7], [1, 2, 5, 6],
+], dtype=np.intp)
+
+_IDENTITY4 = np.eye(4)
+
+# 坐标轴颜色：X=红色，Y=绿色，Z=蓝色
+_AXIS_COLORS = np.array([[255, 0, 0, 255], [0, 255, 0, 255], [0, 0, 255, 255]], dtype=np.uint8)
+
+# 常量颜色行：通过 np.broadcast_to 得到零拷贝的 (N, 4) 视图
+_WIREFRAME_COLOR = np.array([255, 0, 0, 255], dtype=np.uint8)
+
 
 class GLBPointCloudBounds:
     """GLB点云包围盒计算器 - 计算包围盒并生成带可视化的预览文件（原模型数据保持不变）"""
@@ -92,7 +116,6 @@ class GLBPointCloudBounds:
         
         # 处理文件路径
         input_path = self._resolve_file_path(glb_file_path.strip())
-        self._current_input_path = input_path  # 保存当前输入路径供后续使用
         processing_log.append(f"输入文件路径: {input_path}")
         
         if not os.path.exists(input_path):
@@ -106,8 +129,9 @@ class GLBPointCloudBounds:
             processing_log.append("正在加载GLB文件...")
             scene = trimesh.load(input_path)
             
-            # 收集所有点云数据，考虑变换矩阵
+            # 收集所有点云数据，考虑变换矩阵；同时记录场景节点供可视化阶段复用
             all_vertices = []
+            scene_nodes = []
             point_cloud_count = 0
             
             if isinstance(scene, trimesh.Scene):
@@ -115,14 +139,17 @@ class GLBPointCloudBounds:
                     if node_name in scene.geometry:
                         geometry = scene.geometry[node_name]
                         transform_matrix = scene.graph[node_name][0]  # 获取变换矩阵
+                        scene_nodes.append((node_name, geometry, transform_matrix))
                         
                         if hasattr(geometry, 'vertices') and geometry.vertices is not None:
-                            # 应用变换矩阵获取真实世界坐标
-                            if transform_matrix is not None and not np.allclose(transform_matrix, np.eye(4)):
-                                world_vertices = trimesh.transformations.transform_points(geometry.vertices, transform_matrix)
+                            # 应用变换矩阵获取真实世界坐标（场景图变换为仿射矩阵，直接用旋转缩放+平移，避免齐次坐标扩展）
+                            if transform_matrix is not None and not np.array_equal(transform_matrix, _IDENTITY4):
+                                world_vertices = geometry.vertices @ transform_matrix[:3, :3].T
+                                world_vertices += transform_matrix[:3, 3]
                                 processing_log.append(f"发现几何体: {node_name}, 点数: {len(geometry.vertices)}, 已应用变换矩阵")
                             else:
-                                world_vertices = geometry.vertices.copy()
+                                # 后续包围盒计算只读取顶点，无需复制
+                                world_vertices = geometry.vertices
                                 processing_log.append(f"发现几何体: {node_name}, 点数: {len(geometry.vertices)}, 无变换")
                             
                             all_vertices.append(world_vertices)
@@ -145,18 +172,16 @@ class GLBPointCloudBounds:
                 processing_log.append(f"错误: {error_msg}")
                 return ("", "")
             
-            # 合并所有顶点（已经是世界坐标）
-            combined_vertices = np.vstack(all_vertices)
-            total_points = len(combined_vertices)
+            total_points = sum(len(vertices) for vertices in all_vertices)
             processing_log.append(f"合并了 {point_cloud_count} 个几何体，总点数: {total_points} (已应用变换矩阵)")
             
             # 计算包围盒
             processing_log.append(f"计算包围盒类型: {bounding_box_type}")
             
             if bounding_box_type == "axis_aligned":
-                # 轴对齐包围盒 (AABB)
-                min_point = np.min(combined_vertices, axis=0)
-                max_point = np.max(combined_vertices, axis=0)
+                # 轴对齐包围盒 (AABB)：逐几何体求min/max再合并，无需拼接所有顶点
+                min_point = np.min([vertices.min(axis=0) for vertices in all_vertices if len(vertices)], axis=0)
+                max_point = np.max([vertices.max(axis=0) for vertices in all_vertices if len(vertices)], axis=0)
                 extents = max_point - min_point
                 center = (min_point + max_point) / 2
                 
@@ -170,12 +195,9 @@ class GLBPointCloudBounds:
             else:  # oriented
                 # 有向包围盒 (OBB)
                 try:
-                    to_origin, obb_extents = trimesh.bounds.oriented_bounds(combined_vertices)
-                    
-                    # 计算OBB的中心点
-                    obb_center = -to_origin[:3, 3]  # 变换矩阵的平移部分的负值
-                    center = obb_center  # 设置center变量
-                    extents = obb_extents
+                    # 最小体积有向包围盒需要全部世界坐标点（按几何体分别求凸包再合并会改变trimesh的结果）
+                    to_origin, extents = trimesh.bounds.oriented_bounds(np.vstack(all_vertices))
+                    center = -to_origin[:3, 3]  # 变换矩阵的平移部分的负值
                     
                     processing_log.append(f"OBB计算完成:")
                     processing_log.append(f"  中心点: [{center[0]:.6f}, {center[1]:.6f}, {center[2]:.6f}]")
@@ -183,14 +205,17 @@ class GLBPointCloudBounds:
                     processing_log.append(f"  体积: {np.prod(extents):.6f}")
                     
                 except Exception as e:
+                    # 退化点集（如共面、点数过少）的预期回退路径，仅调试级别记录
+                    logger.debug("OBB计算失败，回退到AABB: %s", e)
                     processing_log.append(f"OBB计算失败，回退到AABB: {str(e)}")
                     # 回退到AABB
-                    min_point = np.min(combined_vertices, axis=0)
-                    max_point = np.max(combined_vertices, axis=0)
+                    min_point = np.min([vertices.min(axis=0) for vertices in all_vertices if len(vertices)], axis=0)
+                    max_point = np.max([vertices.max(axis=0) for vertices in all_vertices if len(vertices)], axis=0)
                     extents = max_point - min_point
                     center = (min_point + max_point) / 2
-                    
-
+            
+            # 包围盒已计算完成，释放世界坐标顶点，降低后续导出阶段的峰值内存
+            del all_vertices
             
             # 应用单位转换
             scale_factor = float(units)
@@ -219,15 +244,14 @@ class GLBPointCloudBounds:
             try:
                 processing_log.append("正在生成带包围盒可视化的点云文件...")
                 output_glb_path = self._generate_visualization_pointcloud(
-                    combined_vertices, extents, center, bounding_box_type,
+                    input_path, scene, scene_nodes, extents, center, bounding_box_type,
                     add_bounding_box_visualization, add_coordinate_axes, 
                     wireframe_density, enhance_visibility, output_filename, processing_log
                 )
                 processing_log.append("可视化点云文件生成完成!")
             except Exception as e:
                 processing_log.append(f"可视化点云生成失败: {str(e)}")
-                import traceback
-                traceback.print_exc()
+                logger.exception("可视化点云生成失败")
             
             processing_log.append("GLB点云包围盒计算和可视化完成!")
             
@@ -238,10 +262,8 @@ class GLBPointCloudBounds:
                 
         except Exception as e:
             error_msg = f"计算包围盒时发生错误: {str(e)}"
-            logger.error(error_msg)
+            logger.exception(error_msg)
             processing_log.append(f"错误: {error_msg}")
-            import traceback
-            traceback.print_exc()
             return ("", "")
     
     def _resolve_file_path(self, file_path: str) -> str:
@@ -263,122 +285,58 @@ class GLBPointCloudBounds:
         # 返回原始路径（让后续检查处理错误）
         return file_path
 
-    def _get_current_input_path(self):
-        """获取当前输入文件路径"""
-        return getattr(self, '_current_input_path', None)
-
-    def _normalize_colors(self, colors):
-        """标准化颜色数组为RGBA格式，0-255范围"""
-        if colors is None:
-            return None
-        
-        colors = np.array(colors)
-        
-        # 如果是0-1范围，转换为0-255
-        if colors.max() <= 1.0:
-            colors = (colors * 255).astype(np.uint8)
-        else:
-            colors = colors.astype(np.uint8)
-        
-        # 确保是RGBA格式
-        if colors.shape[1] == 3:  # RGB -> RGBA
-            alpha_channel = np.full((colors.shape[0], 1), 255, dtype=np.uint8)
-            colors = np.hstack([colors, alpha_channel])
-        elif colors.shape[1] != 4:
-            # 如果不是3或4通道，创建白色RGBA
-            colors = np.tile([255, 255, 255, 255], (colors.shape[0], 1)).astype(np.uint8)
-        
-        return colors
-
-    def _generate_visualization_pointcloud(self, combined_vertices, extents, center, bounds_type,
+    def _generate_visualization_pointcloud(self, input_path, original_scene, scene_nodes, extents, center, bounds_type,
                                           add_bounding_box_visualization, add_coordinate_axes,
                                           wireframe_density, enhance_visibility, output_filename, processing_log):
-        """生成包含原始点云、包围盒线框和坐标轴的可视化点云文件"""
+        """生成包含原始点云、包围盒线框和坐标轴的可视化点云文件
+
+        scene_nodes 为包围盒计算阶段收集的 (节点名, 几何体, 变换矩阵) 列表，避免再次遍历场景图
+        """
         try:
-            # 直接使用已加载的原始场景数据，避免重新加载可能改变朝向
-            input_path = self._get_current_input_path()
-            
-            # 提取原始点云数据（完全保持原始状态）
-            all_vertices = []
-            all_colors = []
+            # 未请求任何可视化时输出与输入一致，直接复制GLB文件，跳过场景重建和重新导出
+            if not add_bounding_box_visualization and not add_coordinate_axes and input_path.lower().endswith('.glb'):
+                output_path = self._generate_output_path(output_filename)
+                if os.path.abspath(output_path) != os.path.abspath(input_path):
+                    shutil.copyfile(input_path, output_path)
+                processing_log.append(f"未请求包围盒和坐标轴可视化，直接复制输入文件: {output_path}")
+                return output_path
+            
+            # 直接使用已加载的原始场景数据，避免重复读取和解析GLB文件
+            # 原始几何体原样加入新场景，这里只统计点数，不再提取顶点和颜色副本
             original_point_count = 0
             
-            # 使用之前已经加载的combined_vertices作为基础，重新从原始场景提取完整数据
-            original_scene = trimesh.load(input_path)
-            
             # 创建一个新的场景，完全保持原始场景的结构和变换
             visualization_scene = trimesh.Scene()
             
             # 保持原始场景的完整结构
             if isinstance(original_scene, trimesh.Scene):
                 # 完全复制原始场景的所有几何体和变换
-                for node_name in original_scene.graph.nodes:
-                    if node_name in original_scene.geometry:
-                        geometry = original_scene.geometry[node_name]
-                        transform_matrix = original_scene.graph[node_name][0]  # 获取变换矩阵
-                        
-                        # 完全复制几何体，保持所有属性
-                        copied_geometry = geometry.copy()
-                        
-                        # 添加到新场景，保持原始的变换矩阵
-                        visualization_scene.add_geometry(copied_geometry, node_name=node_name, transform=transform_matrix)
+                for node_name, geometry, transform_matrix in scene_nodes:
+                    # 直接添加原始几何体（导出不会修改几何体，无需复制），保持原始的变换矩阵和几何体名称
+                    # （收集阶段按节点名查找几何体，节点名即原场景中的几何体名）
+                    visualization_scene.add_geometry(
+                        geometry,
+                        node_name=node_name,
+                        geom_name=geometry.metadata.get("name", node_name),
+                        transform=transform_matrix,
+                    )
+                    
+                    # 统计点数（真实包围盒计算已在前面完成）
+                    if hasattr(geometry, 'vertices') and geometry.vertices is not None:
+                        original_point_count += len(geometry.vertices)
                         
-                        # 提取顶点用于统计（注意：这里用于显示统计，真实包围盒计算已在前面完成）
-                        if hasattr(geometry, 'vertices') and geometry.vertices is not None:
-                            # 这里不需要再次应用变换，因为包围盒计算已经在combined_vertices中处理过了
-                            all_vertices.append(geometry.vertices)
-                            
-                            # 保持原始颜色
-                            if isinstance(geometry, trimesh.PointCloud):
-                                if hasattr(geometry.visual, 'vertex_colors') and geometry.visual.vertex_colors is not None:
-                                    colors = geometry.visual.vertex_colors.copy()
-                                elif hasattr(geometry, 'colors') and geometry.colors is not None:
-                                    colors = geometry.colors.copy()
-                                else:
-                                    colors = np.tile([255, 255, 255, 255], (len(geometry.vertices), 1))
-                            else:
-                                if hasattr(geometry.visual, 'vertex_colors') and geometry.visual.vertex_colors is not None:
-                                    colors = geometry.visual.vertex_colors.copy()
-                                else:
-                                    colors = np.tile([200, 200, 200, 255], (len(geometry.vertices), 1))
-                            
-                            # 确保颜色格式一致 (RGBA, 0-255)
-                            colors = self._normalize_colors(colors)
-                            all_colors.append(colors)
-                            original_point_count += len(geometry.vertices)
-                            
-                        processing_log.append(f"完全保持原始几何体: {node_name}, 变换矩阵和所有属性已保留")
+                    processing_log.append(f"完全保持原始几何体: {node_name}, 变换矩阵和所有属性已保留")
             
             elif isinstance(original_scene, trimesh.PointCloud):
-                # 单个点云，直接复制
-                visualization_scene = original_scene.copy()
-                all_vertices.append(original_scene.vertices)
-                
-                if hasattr(original_scene.visual, 'vertex_colors') and original_scene.visual.vertex_colors is not None:
-                    colors = original_scene.visual.vertex_colors.copy()
-                elif hasattr(original_scene, 'colors') and original_scene.colors is not None:
-                    colors = original_scene.colors.copy()
-                else:
-                    colors = np.tile([255, 255, 255, 255], (len(original_scene.vertices), 1))
-                
-                colors = self._normalize_colors(colors)
-                all_colors.append(colors)
+                # 单个点云，直接加入新场景
+                visualization_scene.add_geometry(original_scene, node_name="main_pointcloud")
                 original_point_count = len(original_scene.vertices)
                 processing_log.append(f"完全保持原始点云: {original_point_count:,} 个点")
             
             else:
                 # 单个几何体，转换为场景保持结构
-                visualization_scene.add_geometry(original_scene.copy(), node_name="main_geometry")
+                visualization_scene.add_geometry(original_scene, node_name="main_geometry")
                 if hasattr(original_scene, 'vertices') and original_scene.vertices is not None:
-                    all_vertices.append(original_scene.vertices)
-                    
-                    if hasattr(original_scene.visual, 'vertex_colors') and original_scene.visual.vertex_colors is not None:
-                        colors = original_scene.visual.vertex_colors.copy()
-                    else:
-                        colors = np.tile([200, 200, 200, 255], (len(original_scene.vertices), 1))
-                    
-                    colors = self._normalize_colors(colors)
-                    all_colors.append(colors)
                     original_point_count = len(original_scene.vertices)
                     processing_log.append(f"完全保持原始几何体: {original_point_count:,} 个点")
             
@@ -437,6 +395,10 @@ class GLBPointCloudBounds:
     def _create_bounding_box_pointcloud(self, extents, center, bounds_type, wireframe_density, enhance_visibility, processing_log):
         """创建包围盒线框的点云表示"""
         try:
+            # GLB以float32存储顶点，可视化点全程使用float32生成
+            center = np.asarray(center, dtype=np.float32)
+            extents = np.asarray(extents, dtype=np.float32)
+            
             # 计算包围盒的8个顶点
             min_point = center - extents/2
             max_point = center + extents/2
@@ -450,86 +412,41 @@ class GLBPointCloudBounds:
                 [max_point[0], min_point[1], max_point[2]],  # 5
                 [max_point[0], max_point[1], max_point[2]],  # 6: max corner
                 [min_point[0], max_point[1], max_point[2]],  # 7
-            ])
-            
-            # 定义包围盒的12条边
-            edges = [
-                (0, 1), (1, 2), (2, 3), (3, 0),  # 底面
-                (4, 5), (5, 6), (6, 7), (7, 4),  # 顶面
-                (0, 4), (1, 5), (2, 6), (3, 7),  # 垂直边
-            ]
-            
-            wireframe_points = []
+            ], dtype=np.float32)
+            
+            # 1. 生成线框边上的点（更密集）：12条边 × wireframe_density 个插值点一次广播生成
+            edge_starts = box_vertices[_BOX_EDGES[:, 0]]
+            edge_ends = box_vertices[_BOX_EDGES[:, 1]]
+            if viz_kernels_available():
+                edge_points = np.empty((len(_BOX_EDGES) * wireframe_density, 3), dtype=np.float32)
+                edge_points_kernel(edge_starts, edge_ends, wireframe_density, edge_points)
+            else:
+                t = np.linspace(0.0, 1.0, wireframe_density, dtype=np.float32)
+                edge_points = (edge_starts[:, None, :] + t[None, :, None] * (edge_ends - edge_starts)[:, None, :]).reshape(-1, 3)
             
-            # 1. 生成线框边上的点（更密集）
-            for start_idx, end_idx in edges:
-                start_point = box_vertices[start_idx]
-                end_point = box_vertices[end_idx]
-                
-                # 在每条边上生成密集的点
-                for i in range(wireframe_density):
-                    t = i / (wireframe_density - 1) if wireframe_density > 1 else 0
-                    point = start_point + t * (end_point - start_point)
-                    wireframe_points.append(point)
+            wireframe_parts = [edge_points]
             
             # 2. 添加顶点高亮和面中心标记（可选增强可见性）
             if enhance_visibility:
-                # 顶点高亮（每个顶点周围添加小点云）
+                rng = np.random.default_rng()
+                
+                # 顶点高亮（每个顶点周围添加小点云球）
                 vertex_highlight_radius = np.min(extents) * 0.01  # 顶点高亮半径
                 highlight_density = max(5, wireframe_density // 10)  # 顶点周围的点数
+                wireframe_parts.append(self._sample_sphere_points(rng, box_vertices, highlight_density, vertex_highlight_radius))
                 
-                for vertex in box_vertices:
-                    # 在每个顶点周围创建小的点云球
-                    for i in range(highlight_density):
-                        # 生成随机方向
-                        theta = np.random.uniform(0, 2 * np.pi)
-                        phi = np.random.uniform(0, np.pi)
-                        r = np.random.uniform(0, vertex_highlight_radius)
-                        
-                        # 球坐标转换为笛卡尔坐标
-                        x = vertex[0] + r * np.sin(phi) * np.cos(theta)
-                        y = vertex[1] + r * np.sin(phi) * np.sin(theta)
-                        z = vertex[2] + r * np.cos(phi)
-                        
-                        wireframe_points.append([x, y, z])
-                
-                # 面中心点标记
-                face_centers = [
-                    # 底面中心
-                    (box_vertices[0] + box_vertices[1] + box_vertices[2] + box_vertices[3]) / 4,
-                    # 顶面中心
-                    (box_vertices[4] + box_vertices[5] + box_vertices[6] + box_vertices[7]) / 4,
-                    # 前面中心
-                    (box_vertices[0] + box_vertices[1] + box_vertices[4] + box_vertices[5]) / 4,
-                    # 后面中心
-                    (box_vertices[2] + box_vertices[3] + box_vertices[6] + box_vertices[7]) / 4,
-                    # 左面中心
-                    (box_vertices[0] + box_vertices[3] + box_vertices[4] + box_vertices[7]) / 4,
-                    # 右面中心
-                    (box_vertices[1] + box_vertices[2] + box_vertices[5] + box_vertices[6]) / 4,
-                ]
+                # 面中心点标记：6个面的中心一次索引求均值
+                face_centers = box_vertices[_FACE_GROUPS].mean(axis=1)
                 
                 # 在每个面中心添加标记点
                 face_mark_density = max(3, wireframe_density // 20)
                 face_mark_radius = np.min(extents) * 0.005
-                
-                for face_center in face_centers:
-                    for i in range(face_mark_density):
-                        # 在面中心周围添加小的点云
-                        theta = np.random.uniform(0, 2 * np.pi)
-                        phi = np.random.uniform(0, np.pi)
-                        r = np.random.uniform(0, face_mark_radius)
-                        
-                        x = face_center[0] + r * np.sin(phi) * np.cos(theta)
-                        y = face_center[1] + r * np.sin(phi) * np.sin(theta)
-                        z = face_center[2] + r * np.cos(phi)
-                        
-                        wireframe_points.append([x, y, z])
+                wireframe_parts.append(self._sample_sphere_points(rng, face_centers, face_mark_density, face_mark_radius))
             
-            wireframe_vertices = np.array(wireframe_points)
+            wireframe_vertices = np.concatenate(wireframe_parts)
             
-            # 为包围盒线框设置红色
-            wireframe_colors = np.tile([255, 0, 0, 255], (len(wireframe_vertices), 1))
+            # 为包围盒线框设置红色（只读广播视图，由 trimesh.PointCloud 在写入时复制）
+            wireframe_colors = np.broadcast_to(_WIREFRAME_COLOR, (len(wireframe_vertices), 4))
             
             processing_log.append(f"包围盒线框生成: {len(wireframe_vertices):,} 个点 (密度={wireframe_density})")
             
@@ -539,113 +456,79 @@ class GLBPointCloudBounds:
             processing_log.append(f"创建包围盒点云失败: {str(e)}")
             return np.array([]), np.array([])
     
+    def _sample_sphere_points(self, rng, centers, count, radius):
+        """在每个中心点周围的球体内随机采样 count 个点，批量生成所有随机数"""
+        if viz_kernels_available():
+            out = np.empty((len(centers) * count, 3), dtype=np.float32)
+            sphere_points_kernel(centers, rng.random((len(centers), count, 3), dtype=np.float32), radius, out)
+            return out
+        
+        shape = (len(centers), count)
+        theta = rng.uniform(0, 2 * np.pi, shape).astype(np.float32, copy=False)
+        phi = rng.uniform(0, np.pi, shape).astype(np.float32, copy=False)
+        r = rng.uniform(0, radius, shape).astype(np.float32, copy=False)
+        
+        # 球坐标转换为笛卡尔坐标
+        r_sin_phi = r * np.sin(phi)
+        offsets = np.stack([r_sin_phi * np.cos(theta), r_sin_phi * np.sin(theta), r * np.cos(phi)], axis=-1)
+        return (centers[:, None, :] + offsets).reshape(-1, 3)
+    
     def _create_coordinate_axes_pointcloud(self, extents, origin_center, wireframe_density, processing_log):
         """创建坐标轴的点云表示"""
         try:
+            extents = np.asarray(extents, dtype=np.float32)
             axis_length = np.max(extents) * 0.4
             axis_thickness = np.min(extents) * 0.005  # 坐标轴厚度
-            axes_points = []
-            axes_colors = []
+            origin_center = np.asarray(origin_center, dtype=np.float32)
             
             # 计算坐标轴密度
             axis_line_density = wireframe_density
             axis_thickness_points = max(3, wireframe_density // 15)  # 厚度方向的点数
             
-            # X轴 - 红色（粗线条）- 从点云中心开始
-            for i in range(axis_line_density):
-                t = i / (axis_line_density - 1) if axis_line_density > 1 else 0
-                base_point = [origin_center[0] + t * axis_length, origin_center[1], origin_center[2]]
-                
-                # 主轴线
-                axes_points.append(base_point)
-                axes_colors.append([255, 0, 0, 255])
-                
-                # 增加厚度（在YZ平面上添加点）
-                for j in range(axis_thickness_points):
-                    for k in range(axis_thickness_points):
-                        offset_y = (j - axis_thickness_points//2) * axis_thickness / axis_thickness_points
-                        offset_z = (k - axis_thickness_points//2) * axis_thickness / axis_thickness_points
-                        thick_point = [base_point[0], base_point[1] + offset_y, base_point[2] + offset_z]
-                        axes_points.append(thick_point)
-                        axes_colors.append([255, 0, 0, 255])
-            
-            # X轴箭头头部
+            # 轴线采样参数和厚度方向偏移网格（三个轴共用）
+            t = np.linspace(0.0, 1.0, axis_line_density, dtype=np.float32)
+            thickness_offsets = ((np.arange(axis_thickness_points) - axis_thickness_points // 2) * axis_thickness / axis_thickness_points).astype(np.float32)
+            offset_j, offset_k = np.meshgrid(thickness_offsets, thickness_offsets, indexing='ij')
+            
+            # 箭头头部参数
             arrow_length = axis_length * 0.1
             arrow_base = axis_length * 0.9
-            for i in range(axis_line_density // 2):
-                t = i / (axis_line_density // 2 - 1) if axis_line_density > 2 else 0
-                # 箭头点
-                arrow_x = origin_center[0] + arrow_base + t * arrow_length
-                arrow_offset = (1 - t) * axis_thickness * 2
-                
-                axes_points.append([arrow_x, origin_center[1] + arrow_offset, origin_center[2]])
-                axes_points.append([arrow_x, origin_center[1] - arrow_offset, origin_center[2]])
-                axes_points.append([arrow_x, origin_center[1], origin_center[2] + arrow_offset])
-                axes_points.append([arrow_x, origin_center[1], origin_center[2] - arrow_offset])
-                axes_colors.extend([[255, 0, 0, 255]] * 4)
-            
-            # Y轴 - 绿色（粗线条）- 从点云中心开始
-            for i in range(axis_line_density):
-                t = i / (axis_line_density - 1) if axis_line_density > 1 else 0
-                base_point = [origin_center[0], origin_center[1] + t * axis_length, origin_center[2]]
-                
-                # 主轴线
-                axes_points.append(base_point)
-                axes_colors.append([0, 255, 0, 255])
-                
-                # 增加厚度（在XZ平面上添加点）
-                for j in range(axis_thickness_points):
-                    for k in range(axis_thickness_points):
-                        offset_x = (j - axis_thickness_points//2) * axis_thickness / axis_thickness_points
-                        offset_z = (k - axis_thickness_points//2) * axis_thickness / axis_thickness_points
-                        thick_point = [base_point[0] + offset_x, base_point[1], base_point[2] + offset_z]
-                        axes_points.append(thick_point)
-                        axes_colors.append([0, 255, 0, 255])
-            
-            # Y轴箭头头部
-            for i in range(axis_line_density // 2):
-                t = i / (axis_line_density // 2 - 1) if axis_line_density > 2 else 0
-                arrow_y = origin_center[1] + arrow_base + t * arrow_length
-                arrow_offset = (1 - t) * axis_thickness * 2
-                
-                axes_points.append([origin_center[0] + arrow_offset, arrow_y, origin_center[2]])
-                axes_points.append([origin_center[0] - arrow_offset, arrow_y, origin_center[2]])
-                axes_points.append([origin_center[0], arrow_y, origin_center[2] + arrow_offset])
-                axes_points.append([origin_center[0], arrow_y, origin_center[2] - arrow_offset])
-                axes_colors.extend([[0, 255, 0, 255]] * 4)
-            
-            # Z轴 - 蓝色（粗线条）- 从点云中心开始
-            for i in range(axis_line_density):
-                t = i / (axis_line_density - 1) if axis_line_density > 1 else 0
-                base_point = [origin_center[0], origin_center[1], origin_center[2] + t * axis_length]
+            arrow_t = np.linspace(0.0, 1.0, axis_line_density // 2, dtype=np.float32) if axis_line_density > 2 else np.zeros(axis_line_density // 2, dtype=np.float32)
+            arrow_offset = ((1 - arrow_t) * axis_thickness * 2).astype(np.float32, copy=False)
+            
+            axes_points = []
+            axis_point_counts = []
+            
+            # X轴 - 红色，Y轴 - 绿色，Z轴 - 蓝色（粗线条）- 从点云中心开始
+            for axis in range(3):
+                other_axes = [a for a in range(3) if a != axis]
                 
-                # 主轴线
-                axes_points.append(base_point)
-                axes_colors.append([0, 0, 255, 255])
+                # 每个采样点：主轴线点 + 垂直平面上的厚度网格点
+                if viz_kernels_available():
+                    line_points = np.empty((axis_line_density * (1 + offset_j.size), 3), dtype=np.float32)
+                    axis_line_points_kernel(origin_center, axis, other_axes[0], other_axes[1], t, axis_length,
+                                            offset_j.ravel(), offset_k.ravel(), line_points)
+                else:
+                    line_points = np.tile(origin_center, (axis_line_density, 1 + offset_j.size, 1))
+                    line_points[:, :, axis] += t[:, None] * axis_length
+                    line_points[:, 1:, other_axes[0]] += offset_j.ravel()
+                    line_points[:, 1:, other_axes[1]] += offset_k.ravel()
+                    line_points = line_points.reshape(-1, 3)
                 
-                # 增加厚度（在XY平面上添加点）
-                for j in range(axis_thickness_points):
-                    for k in range(axis_thickness_points):
-                        offset_x = (j - axis_thickness_points//2) * axis_thickness / axis_thickness_points
-                        offset_y = (k - axis_thickness_points//2) * axis_thickness / axis_thickness_points
-                        thick_point = [base_point[0] + offset_x, base_point[1] + offset_y, base_point[2]]
-                        axes_points.append(thick_point)
-                        axes_colors.append([0, 0, 255, 255])
-            
-            # Z轴箭头头部
-            for i in range(axis_line_density // 2):
-                t = i / (axis_line_density // 2 - 1) if axis_line_density > 2 else 0
-                arrow_z = origin_center[2] + arrow_base + t * arrow_length
-                arrow_offset = (1 - t) * axis_thickness * 2
+                # 箭头头部：在两个垂直方向上各取正负偏移
+                arrow_points = np.tile(origin_center, (len(arrow_t), 4, 1))
+                arrow_points[:, :, axis] += (arrow_base + arrow_t * arrow_length)[:, None]
+                arrow_points[:, 0, other_axes[0]] += arrow_offset
+                arrow_points[:, 1, other_axes[0]] -= arrow_offset
+                arrow_points[:, 2, other_axes[1]] += arrow_offset
+                arrow_points[:, 3, other_axes[1]] -= arrow_offset
                 
-                axes_points.append([origin_center[0] + arrow_offset, origin_center[1], arrow_z])
-                axes_points.append([origin_center[0] - arrow_offset, origin_center[1], arrow_z])
-                axes_points.append([origin_center[0], origin_center[1] + arrow_offset, arrow_z])
-                axes_points.append([origin_center[0], origin_center[1] - arrow_offset, arrow_z])
-                axes_colors.extend([[0, 0, 255, 255]] * 4)
-            
-            axes_vertices = np.array(axes_points)
-            axes_colors_array = np.array(axes_colors)
+                axes_points.append(line_points)
+                axes_points.append(arrow_points.reshape(-1, 3))
+                axis_point_counts.append(len(line_points) + arrow_points.shape[0] * 4)
+            
+            axes_vertices = np.concatenate(axes_points)
+            axes_colors_array = np.repeat(_AXIS_COLORS, axis_point_counts, axis=0)
             
             processing_log.append(f"坐标轴生成: {len(axes_vertices):,} 个点 (长度={axis_length:.3f}, 原点=[{origin_center[0]:.3f}, {origin_center[1]:.3f}, {origin_center[2]:.3f}])")
             
@@ -1,8 +1,54 @@
 from .common import *
 
+# 密度缓存的最大条目数（按文件和半径参数区分），调整阈值类参数时可直接复用密度结果
+_DENSITY_CACHE_SIZE = 4
+
+
+if NUMBA_AVAILABLE:
+    @numba.njit(parallel=True, fastmath=True, cache=True)
+    def _count_neighbors_njit(vertices, radius_sq, out):
+        """无SciPy时的邻居计数内核：逐点比较平方距离，不分配临时数组，结果排除自身"""
+        n = vertices.shape[0]
+        for i in numba.prange(n):
+            xi = vertices[i, 0]
+            yi = vertices[i, 1]
+            zi = vertices[i, 2]
+            count = 0
+            for j in range(n):
+                dx = vertices[j, 0] - xi
+                dy = vertices[j, 1] - yi
+                dz = vertices[j, 2] - zi
+                if dx * dx + dy * dy + dz * dz <= radius_sq:
+                    count += 1
+            out[i] = count - 1
+
+    def _warm_up_numba_kernels():
+        """以最小输入调用各内核，触发编译或加载编译缓存"""
+        _count_neighbors_njit(np.zeros((1, 3), dtype=np.float32), np.float32(1.0), np.empty(1, dtype=np.int32))
+
+
+# numba内核在首次使用时才预热，不拖慢节点导入（cache=True时直接加载磁盘上的编译缓存）；None表示尚未预热
+_NUMBA_KERNELS_READY = None if NUMBA_AVAILABLE else False
+
+
+def _numba_kernels_ready():
+    """首次调用时预热numba内核并记录结果，返回内核是否可用；编译失败时回退到numpy实现"""
+    global _NUMBA_KERNELS_READY
+    if _NUMBA_KERNELS_READY is None:
+        try:
+            _warm_up_numba_kernels()
+            _NUMBA_KERNELS_READY = True
+        except Exception as e:
+            logger.warning(f"numba内核编译失败，回退到numpy实现: {e}")
+            _NUMBA_KERNELS_READY = False
+    return _NUMBA_KERNELS_READY
+
 class GLBPointCloudDensityFilter:
     """GLB点云密度过滤器 - 根据局部密度删除稀疏区域，保留密度最高的核心区域"""
 
+    # (文件路径, 修改时间, 文件大小, 邻域半径, 自适应半径) -> {点云名: 每点密度}
+    _density_cache = OrderedDict()
+
     @classmethod
     def INPUT_TYPES(cls):
         return {
@@ -96,6 +142,13 @@ class GLBPointCloudDensityFilter:
             return ("", "")
         
         try:
+            # 同一文件、相同半径参数下的密度结果可复用，只重新计算阈值掩码
+            file_stat = os.stat(input_path)
+            cache_key = (os.path.abspath(input_path), file_stat.st_mtime_ns, file_stat.st_size,
+                         neighborhood_radius, use_adaptive_radius)
+            cached_densities = self._density_cache.get(cache_key)
+            computed_densities = {}
+            
             # 加载GLB文件
             processing_log.append("正在加载GLB文件...")
             scene = trimesh.load(input_path)
@@ -140,20 +193,30 @@ class GLBPointCloudDensityFilter:
                 original_count = len(point_cloud.vertices)
                 total_original_points += original_count
                 
-                # 获取原始点云的所有属性和状态
-                original_vertices = point_cloud.vertices.copy()
+                # 获取原始点云的顶点（密度过滤只读取顶点，掩码索引时才生成新数组，无需预先复制）
+                original_vertices = np.asarray(point_cloud.vertices)
                 colors = None
                 
-                # 获取颜色信息
+                # 获取颜色信息（统一为连续uint8 RGBA，掩码索引时每点只搬运4字节）
                 if hasattr(point_cloud.visual, 'vertex_colors') and point_cloud.visual.vertex_colors is not None:
-                    colors = point_cloud.visual.vertex_colors.copy()
+                    colors = np.ascontiguousarray(point_cloud.visual.vertex_colors, dtype=np.uint8)
                 elif hasattr(point_cloud, 'colors') and point_cloud.colors is not None:
-                    colors = point_cloud.colors.copy()
+                    colors = np.ascontiguousarray(point_cloud.colors, dtype=np.uint8)
+                
+                # 计算局部密度（命中缓存时跳过KDTree构建和邻域查询）
+                densities = cached_densities.get(name) if cached_densities is not None else None
+                if densities is not None and len(densities) == original_count:
+                    processing_log.append(f"复用缓存的密度结果: {name}")
+                else:
+                    densities = self._compute_densities(
+                        original_vertices, neighborhood_radius, use_adaptive_radius, processing_log
+                    )
+                    densities.setflags(write=False)
+                computed_densities[name] = densities
                 
                 # 应用密度过滤（仅基于密度，不改变顶点坐标）
                 keep_mask, filter_info = self._apply_density_filter(
-                    original_vertices, colors, density_threshold, neighborhood_radius, min_neighbors,
-                    preserve_core_percentage, use_adaptive_radius, processing_log
+                    densities, density_threshold, min_neighbors, preserve_core_percentage, processing_log
                 )
                 
                 # 应用掩码，保留原始的顶点坐标
@@ -165,26 +228,22 @@ class GLBPointCloudDensityFilter:
                 
                 processing_log.append(f"点云 {name}: 原始 {original_count} -> 保留 {filtered_count} (删除 {original_count - filtered_count})")
                 
-                # 创建过滤后的点云，保留所有原始属性
+                # 记录过滤结果，写回时直接更新原始点云，无需先复制整个点云对象
                 if filtered_count > 0:
-                    # 使用原始点云作为模板，只更新顶点和颜色
-                    filtered_pc = point_cloud.copy()
-                    filtered_pc.vertices = filtered_vertices
-                    if filtered_colors is not None:
-                        filtered_pc.visual.vertex_colors = filtered_colors
-                    
-                    filtered_point_clouds.append((name, filtered_pc))
+                    filtered_point_clouds.append((name, point_cloud, filtered_vertices, filtered_colors))
                     processing_log.append(f"保留点云 {name} 的所有原始属性和状态")
                 else:
                     processing_log.append(f"警告: 点云 {name} 过滤后没有剩余点")
             
+            self._store_densities(cache_key, computed_densities)
+            
             # 直接修改原始场景，保持所有几何信息不变
             if filtered_point_clouds:
                 # 使用原始场景作为基础，直接替换点云数据
                 new_scene = scene
                 
                 # 直接修改原始场景中的点云几何体，保持变换不变
-                for name, filtered_pc in filtered_point_clouds:
+                for name, point_cloud, filtered_vertices, filtered_colors in filtered_point_clouds:
                     if isinstance(scene, trimesh.Scene):
                         # 获取原始几何体
                         if name in scene.geometry:
@@ -192,23 +251,21 @@ class GLBPointCloudDensityFilter:
                             
                             # 如果是点云，直接修改顶点和颜色
                             if isinstance(original_geometry, trimesh.PointCloud):
-                                original_geometry.vertices = filtered_pc.vertices
-                                if hasattr(filtered_pc.visual, 'vertex_colors') and filtered_pc.visual.vertex_colors is not None:
-                                    original_geometry.visual.vertex_colors = filtered_pc.visual.vertex_colors
-                                
+                                self._update_point_cloud(original_geometry, filtered_vertices, filtered_colors)
                                 processing_log.append(f"直接修改原始点云 {name}，保持所有变换和属性不变")
                             else:
                                 # 如果不是点云类型，替换整个几何体但保持变换
                                 scene.delete_geometry(name)
-                                scene.add_geometry(filtered_pc, node_name=name)
+                                scene.add_geometry(trimesh.PointCloud(vertices=filtered_vertices, colors=filtered_colors), node_name=name)
                                 processing_log.append(f"替换几何体 {name}，尝试保持变换")
                         else:
                             # 新增几何体
-                            scene.add_geometry(filtered_pc, node_name=name)
+                            scene.add_geometry(trimesh.PointCloud(vertices=filtered_vertices, colors=filtered_colors), node_name=name)
                             processing_log.append(f"添加新点云 {name}")
                     else:
-                        # 单个几何体的情况
-                        new_scene = filtered_pc
+                        # 单个几何体的情况：直接更新该点云，保留其原始属性
+                        self._update_point_cloud(point_cloud, filtered_vertices, filtered_colors)
+                        new_scene = point_cloud
                         processing_log.append("单个几何体，直接使用过滤后的点云")
                 
                 processing_log.append("直接修改原始场景，所有变换矩阵和几何属性完全保持不变")
@@ -264,20 +321,38 @@ class GLBPointCloudDensityFilter:
             traceback.print_exc()
             return ("", "")
     
-    def _apply_density_filter(self, vertices, colors, density_threshold, neighborhood_radius, 
-                             min_neighbors, preserve_core_percentage, use_adaptive_radius, processing_log):
+    def _update_point_cloud(self, point_cloud, vertices, colors):
+        """原地替换点云的顶点和颜色，保持其余属性不变"""
+        point_cloud.vertices = vertices
+        if colors is not None:
+            point_cloud.visual.vertex_colors = colors
+    
+    def _store_densities(self, cache_key, densities_by_name):
+        """记录本次计算的密度结果，超出容量时淘汰最久未使用的条目"""
+        cache = self._density_cache
+        cache[cache_key] = densities_by_name
+        cache.move_to_end(cache_key)
+        while len(cache) > _DENSITY_CACHE_SIZE:
+            cache.popitem(last=False)
+    
+    def _compute_densities(self, vertices, neighborhood_radius, use_adaptive_radius, processing_log):
         """
-        应用密度过滤算法，返回保留点的掩码
+        计算每个点的局部密度（邻域内的邻居点数），只读取vertices，不修改输入数组
         """
         
         n_points = len(vertices)
         processing_log.append(f"开始密度分析，总点数: {n_points}")
         
+        BIG_POINT_THRESHOLD = 200000  # 20万点以上使用体素统计
+        
+        # 包围盒只计算一次，自适应半径和体素统计共用
+        if use_adaptive_radius or n_points > BIG_POINT_THRESHOLD:
+            bbox_min = np.min(vertices, axis=0)
+            bbox_max = np.max(vertices, axis=0)
+        
         # 自适应半径调整
         if use_adaptive_radius:
             # 计算点云的包围盒对角线长度
-            bbox_min = np.min(vertices, axis=0)
-            bbox_max = np.max(vertices, axis=0)
             bbox_diagonal = np.linalg.norm(bbox_max - bbox_min)
             
             # 根据包围盒大小调整半径
@@ -285,60 +360,93 @@ class GLBPointCloudDensityFilter:
             processing_log.append(f"自适应半径: {neighborhood_radius} -> {adaptive_radius:.4f} (基于包围盒对角线 {bbox_diagonal:.4f})")
             neighborhood_radius = adaptive_radius
         
-        # 使用KDTree进行高效的邻域搜索
-        try:
-            from scipy.spatial import cKDTree
-            kdtree = cKDTree(vertices)
-            processing_log.append("使用scipy.spatial.cKDTree进行邻域搜索")
-        except ImportError:
-            processing_log.append("scipy不可用，使用简化的距离计算")
-            kdtree = None
+        # 使用KDTree进行高效的邻域搜索（体素统计路径不使用KDTree，跳过构建）
+        kdtree = None
+        if n_points <= BIG_POINT_THRESHOLD:
+            try:
+                from scipy.spatial import cKDTree
+                # 树只构建一次、查询一次：跳过平衡和节点压缩以缩短构建时间，较大的叶子减少树遍历开销
+                kdtree = cKDTree(vertices, leafsize=32, balanced_tree=False, compact_nodes=False)
+                processing_log.append("使用scipy.spatial.cKDTree进行邻域搜索")
+            except ImportError:
+                processing_log.append("scipy不可用，使用简化的距离计算")
         
         # 计算每个点的局部密度
         densities = np.zeros(n_points)
         
-        BIG_POINT_THRESHOLD = 200000  # 20万点以上使用体素统计
         if n_points > BIG_POINT_THRESHOLD:
             # ------------------------------------------------------------------
             # 大规模点云：使用体素统计近似密度 (O(N) 内存, 非递归, 无KDTree)
             # ------------------------------------------------------------------
             start_t = time.time()
-            bbox_min = vertices.min(axis=0)
             voxel_size = neighborhood_radius  # 体素边长与邻域半径一致
-            voxel_indices = np.floor((vertices - bbox_min) / voxel_size).astype(np.int32)
-            # 使用结构化dtype便于unique
-            voxel_keys = voxel_indices.view([('x', np.int32), ('y', np.int32), ('z', np.int32)]).reshape(-1)
-            unique_keys, inverse_indices, counts = np.unique(voxel_keys, return_inverse=True, return_counts=True)
-            densities = counts[inverse_indices] - 1  # 同体素内点数近似邻居数
+            # 体素坐标整体偏移1并在两侧各留一层空体素，3×3×3邻域的线性键偏移不会越界回绕
+            # 原地缩放：相对坐标非负，截断取整即等价于floor，省去除法和floor的临时数组
+            # 在原始精度下减去包围盒最小值，远离原点的坐标（如地理坐标）也能得到正确的体素索引
+            inv_voxel_size = 1.0 / voxel_size
+            scaled = vertices - bbox_min
+            scaled *= inv_voxel_size
+            voxel_indices = scaled.astype(np.int64)
+            del scaled
+            voxel_indices += 1
+            # 最大体素坐标由包围盒直接得到，无需再扫描体素索引
+            dims = ((bbox_max - bbox_min) * inv_voxel_size).astype(np.int64) + 3
+            # 线性化为单个int64键，避免结构化dtype排序
+            flat_keys = (voxel_indices[:, 0] * dims[1] + voxel_indices[:, 1]) * dims[2] + voxel_indices[:, 2]
+            n_voxels = int(dims[0]) * int(dims[1]) * int(dims[2])
+            # 统计点所在体素及其26个相邻体素的点数之和，覆盖整个邻域球，避免体素边界处低估邻居数
+            # 稠密网格计数时bincount会产生临时int64数组，体素数超过点数数倍后峰值内存高于稀疏路径
+            if n_voxels <= 4 * n_points:
+                # 体素网格不大时直接按线性索引计数，O(N) 无需排序；计数不超过点数，int32即可，网格内存减半
+                counts = np.bincount(flat_keys, minlength=n_voxels).astype(np.int32)
+                occupied_voxels = np.count_nonzero(counts)
+                neighborhood_counts = self._box_sum_3x3x3(counts.reshape(tuple(dims))).reshape(-1)
+                densities = neighborhood_counts[flat_keys] - 1  # 排除自身
+            else:
+                unique_keys, inverse_indices, counts = np.unique(flat_keys, return_inverse=True, return_counts=True)
+                occupied_voxels = len(unique_keys)
+                neighborhood_counts = self._sparse_neighborhood_counts(unique_keys, counts, dims)
+                densities = neighborhood_counts[inverse_indices] - 1  # 排除自身
             elapsed = time.time() - start_t
-            processing_log.append(f"体素密度计算完成，用时 {elapsed:.2f}s (体素数={len(unique_keys):,})")
+            processing_log.append(f"体素密度计算完成，用时 {elapsed:.2f}s (体素数={occupied_voxels:,})")
         elif kdtree is not None:
             # -----------------------------
-            # 使用KDTree批量并行查询提高速度
+            # 使用KDTree并行查询，只取邻居计数，不构建邻居索引列表
             # -----------------------------
             start_t = time.time()
-            neighbors_list = kdtree.query_ball_point(vertices, neighborhood_radius, workers=-1)
-            densities = np.fromiter((len(idx) - 1 for idx in neighbors_list), dtype=np.int32, count=n_points)
+            densities = kdtree.query_ball_point(vertices, neighborhood_radius, workers=-1, return_length=True) - 1  # 排除自身
             elapsed = time.time() - start_t
             processing_log.append(f"KDTree密度计算完成，用时 {elapsed:.2f}s (并行查询)")
         else:
             # -----------------------------
-            # 回退到简化的距离计算（仅在小点云或无SciPy时使用）
+            # 回退到简化的距离计算（无SciPy时使用），逐点计算避免O(N^2)距离矩阵内存
             # -----------------------------
             start_t = time.time()
-            # 采用向量化广播一次性计算距离矩阵（O(N^2) 内存消耗大，仅限<50k点）
-            if n_points < 50000:
-                dist_matrix = np.linalg.norm(vertices[None, :, :] - vertices[:, None, :], axis=2)
-                densities = (dist_matrix <= neighborhood_radius).sum(axis=1) - 1  # 排除自身
+            # 先在float64中平移到包围盒最小值附近再转为float32：距离计算只需近似精度，
+            # 局部坐标避免大坐标值（如地理坐标）转float32后丢失精度
+            local_vertices = (vertices - np.min(vertices, axis=0)).astype(np.float32)
+            radius_sq = np.float32(neighborhood_radius) ** 2
+            if _numba_kernels_ready():
+                densities = np.empty(n_points, dtype=np.int32)
+                _count_neighbors_njit(local_vertices, radius_sq, densities)
             else:
-                # 大点云时退化为分批循环
+                # 比较平方距离，省去逐对开方
                 for i in range(n_points):
-                    distances = np.linalg.norm(vertices - vertices[i], axis=1)
-                    neighbor_count = np.sum(distances <= neighborhood_radius) - 1
-                    densities[i] = neighbor_count
+                    offsets = local_vertices - local_vertices[i]
+                    squared_distances = np.einsum('ij,ij->i', offsets, offsets)
+                    densities[i] = np.count_nonzero(squared_distances <= radius_sq) - 1
             elapsed = time.time() - start_t
-            processing_log.append(f"向量化密度计算完成，用时 {elapsed:.2f}s")
+            processing_log.append(f"{'numba并行' if _numba_kernels_ready() else '逐点'}密度计算完成，用时 {elapsed:.2f}s")
+        
+        return densities
+    
+    def _apply_density_filter(self, densities, density_threshold, min_neighbors, preserve_core_percentage,
+                              processing_log):
+        """
+        根据每点密度应用多层过滤策略，返回保留点的掩码
+        """
         
+        n_points = len(densities)
         processing_log.append(f"密度统计: 最小={densities.min():.1f}, 最大={densities.max():.1f}, 平均={densities.mean():.1f}")
         
         # 应用多层过滤策略
@@ -353,14 +461,19 @@ class GLBPointCloudDensityFilter:
         # 2. 基于密度阈值的过滤
         if density_threshold > 0 and np.sum(keep_mask) > 0:
             valid_densities = densities[keep_mask]
-            density_percentile = np.percentile(valid_densities, (1 - density_threshold) * 100)
-            density_mask = densities >= density_percentile
+            # 分位数只需两个相邻次序统计量：在已复制的数组上原地部分排序，再按线性插值取值（与np.percentile一致）
+            position = (1 - density_threshold) * (len(valid_densities) - 1)
+            lower = int(position)
+            upper = min(lower + 1, len(valid_densities) - 1)
+            valid_densities.partition((lower, upper))
+            lower_value = float(valid_densities[lower])
+            density_percentile = lower_value + (float(valid_densities[upper]) - lower_value) * (position - lower)
             
-            # 保留当前mask中的点，再应用密度过滤
-            temp_mask = keep_mask.copy()
-            keep_mask[temp_mask] &= density_mask[temp_mask]
+            # 保留当前mask中的点，再应用密度过滤（原地按位与即为交集）
+            prev_count = np.count_nonzero(keep_mask)
+            keep_mask &= densities >= density_percentile
             
-            removed_by_density = np.sum(temp_mask) - np.sum(keep_mask)
+            removed_by_density = prev_count - np.count_nonzero(keep_mask)
             processing_log.append(f"密度阈值过滤: 删除 {removed_by_density} 个点 (阈值密度: {density_percentile:.1f})")
         
         # 3. 核心区域保护
@@ -377,11 +490,11 @@ class GLBPointCloudDensityFilter:
                 excluded_indices = np.where(~keep_mask)[0]
                 if len(excluded_indices) > 0:
                     excluded_densities = densities[excluded_indices]
-                    # 按密度排序，选择密度最高的点
-                    sorted_indices = excluded_indices[np.argsort(-excluded_densities)]
-                    points_to_restore = min(need_more_points, len(sorted_indices))
+                    # 只需选出密度最高的前k个点，用部分排序代替全排序
+                    points_to_restore = min(need_more_points, len(excluded_indices))
+                    top_k = np.argpartition(-excluded_densities, points_to_restore - 1)[:points_to_restore]
                     
-                    keep_mask[sorted_indices[:points_to_restore]] = True
+                    keep_mask[excluded_indices[top_k]] = True
                     processing_log.append(f"核心区域保护: 恢复 {points_to_restore} 个高密度点")
         
         # 统计信息
@@ -406,6 +519,34 @@ class GLBPointCloudDensityFilter:
         
         return keep_mask, filter_info
     
+    def _box_sum_3x3x3(self, grid):
+        """稠密体素网格的3×3×3邻域求和，按三个轴分离累加（网格边界外视为0）
+
+        原地累加到grid中，三个轴共用一块暂存缓冲区保存累加前的值
+        """
+        scratch = np.empty_like(grid)
+        for axis in range(3):
+            lower = [slice(None)] * 3
+            upper = [slice(None)] * 3
+            lower[axis] = slice(None, -1)
+            upper[axis] = slice(1, None)
+            np.copyto(scratch, grid)
+            grid[tuple(upper)] += scratch[tuple(lower)]
+            grid[tuple(lower)] += scratch[tuple(upper)]
+        return grid
+    
+    def _sparse_neighborhood_counts(self, unique_keys, counts, dims):
+        """稀疏体素的3×3×3邻域求和：在有序体素键上二分查找27个相邻体素"""
+        neighborhood_counts = np.zeros(len(unique_keys), dtype=np.int64)
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for dz in (-1, 0, 1):
+                    neighbor_keys = unique_keys + ((dx * dims[1] + dy) * dims[2] + dz)
+                    positions = np.minimum(np.searchsorted(unique_keys, neighbor_keys), len(unique_keys) - 1)
+                    found = unique_keys[positions] == neighbor_keys
+                    neighborhood_counts += np.where(found, counts[positions], 0)
+        return neighborhood_counts
+    
     def _resolve_file_path(self, file_path: str) -> str:
         """解析文件路径，支持绝对路径和相对路径"""
         if os.path.isabs(file_path):
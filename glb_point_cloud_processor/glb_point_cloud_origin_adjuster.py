@@ -1,4 +1,156 @@
 from .common import *
+from .visualization_kernels import *
+
+# 坐标轴颜色：X=红色，Y=绿色，Z=蓝色
+_AXIS_COLORS = np.array([[255, 0, 0, 255], [0, 255, 0, 255], [0, 0, 255, 255]], dtype=np.uint8)
+
+# 每个坐标轴的列排列：(主轴, 厚度方向1, 厚度方向2)
+_AXIS_PERM = ((0, 1, 2), (1, 0, 2), (2, 0, 1))
+
+_IDENTITY3 = np.eye(3)
+_IDENTITY4 = np.eye(4)
+
+
+if NUMBA_AVAILABLE:
+    @numba.njit(parallel=True, fastmath=True, cache=True)
+    def _update_bounds_njit(vertices, chunks, bounds_min, bounds_max):
+        """单次遍历求顶点包围盒并合并到 bounds_min/bounds_max：分 chunks 块并行，再串行归约各块结果"""
+        n = vertices.shape[0]
+        chunk_min = np.empty((chunks, 3))
+        chunk_max = np.empty((chunks, 3))
+        for c in numba.prange(chunks):
+            start = c * n // chunks
+            end = (c + 1) * n // chunks
+            for d in range(3):
+                chunk_min[c, d] = vertices[start, d]
+                chunk_max[c, d] = vertices[start, d]
+            for i in range(start + 1, end):
+                for d in range(3):
+                    x = vertices[i, d]
+                    if x < chunk_min[c, d]:
+                        chunk_min[c, d] = x
+                    elif x > chunk_max[c, d]:
+                        chunk_max[c, d] = x
+        for c in range(chunks):
+            for d in range(3):
+                if chunk_min[c, d] < bounds_min[d]:
+                    bounds_min[d] = chunk_min[c, d]
+                if chunk_max[c, d] > bounds_max[d]:
+                    bounds_max[d] = chunk_max[c, d]
+
+    def _warm_up_numba_kernels():
+        """以最小输入调用各内核，触发编译或加载编译缓存"""
+        _update_bounds_njit(np.zeros((1, 3)), 1, np.full(3, np.inf), np.full(3, -np.inf))
+
+
+# numba内核在首次使用时才预热，不拖慢节点导入（cache=True时直接加载磁盘上的编译缓存）；None表示尚未预热
+_NUMBA_KERNELS_READY = None if NUMBA_AVAILABLE else False
+
+
+def _numba_kernels_ready():
+    """首次调用时预热numba内核并记录结果，返回内核是否可用；编译失败时回退到numpy实现"""
+    global _NUMBA_KERNELS_READY
+    if _NUMBA_KERNELS_READY is None:
+        try:
+            _warm_up_numba_kernels()
+            _NUMBA_KERNELS_READY = True
+        except Exception as e:
+            logger.warning(f"numba内核编译失败，回退到numpy实现: {e}")
+            _NUMBA_KERNELS_READY = False
+    return _NUMBA_KERNELS_READY
+
+
+def _update_bounds(vertices, bounds_min, bounds_max):
+    """将一组顶点的包围盒合并到 bounds_min/bounds_max（原地更新，空数组跳过）"""
+    if len(vertices) == 0:
+        return
+    if _numba_kernels_ready():
+        chunks = min(numba.get_num_threads(), len(vertices))
+        _update_bounds_njit(np.ascontiguousarray(vertices, dtype=np.float64), chunks, bounds_min, bounds_max)
+    else:
+        np.minimum(bounds_min, vertices.min(axis=0), out=bounds_min)
+        np.maximum(bounds_max, vertices.max(axis=0), out=bounds_max)
+
+
+def _iter_scene(scene):
+    """遍历场景中挂载几何体的节点，返回 [(节点名, 几何体, 变换矩阵)]，变换矩阵只查询一次"""
+    nodes = []
+    for node_name in scene.graph.nodes:
+        geometry = scene.geometry.get(node_name)
+        if geometry is None:
+            continue
+        nodes.append((node_name, geometry, scene.graph[node_name][0]))
+    return nodes
+
+
+def _apply_transform(vertices, matrix):
+    """将4x4变换矩阵应用到顶点，直接使用 R/t 计算，避免齐次坐标的中间拷贝；纯平移矩阵只做加法"""
+    rotation = matrix[:3, :3]
+    translation = matrix[:3, 3]
+    if np.array_equal(rotation, _IDENTITY3):
+        return vertices + translation
+    world_vertices = vertices @ rotation.T
+    world_vertices += translation
+    return world_vertices
+
+
+def _axis_point_count(density):
+    """单个坐标轴的点数：粗线条(每个采样点1+厚度网格点) + 箭头头部(每个采样点4个)"""
+    thickness_points = max(3, density // 15)
+    return density * (1 + thickness_points * thickness_points) + (density // 2) * 4
+
+
+def _world_bounds(vertices, transform_matrix):
+    """求单个几何体在世界坐标下的包围盒，transform_matrix 为 None 表示无需变换"""
+    vertices = np.asarray(vertices)
+    if transform_matrix is not None:
+        vertices = _apply_transform(vertices, transform_matrix)
+    bounds_min = np.full(3, np.inf)
+    bounds_max = np.full(3, -np.inf)
+    _update_bounds(vertices, bounds_min, bounds_max)
+    return bounds_min, bounds_max
+
+
+def _build_axis(axis_idx, center, length, density, thickness, color, vertices, colors):
+    """将单个坐标轴（粗线条+箭头）的点和颜色写入预分配的 vertices(float32)/colors(uint8)
+
+    在规范坐标系(u沿主轴, v/w为厚度平面)中构建点，再按 _AXIS_PERM 排列到实际坐标列
+    """
+    perm = list(_AXIS_PERM[axis_idx])
+    thickness_points = max(3, density // 15)  # 厚度方向的点数
+    
+    center = np.asarray(center, dtype=np.float32)
+    length = np.float32(length)
+    thickness = np.float32(thickness)
+    t = np.linspace(0.0, 1.0, density, dtype=np.float32)
+    thickness_offsets = ((np.arange(thickness_points) - thickness_points // 2) * thickness / thickness_points).astype(np.float32)
+    offset_v, offset_w = np.meshgrid(thickness_offsets, thickness_offsets, indexing='ij')
+    arrow_t = np.linspace(0.0, 1.0, density // 2, dtype=np.float32) if density > 2 else np.zeros(density // 2, dtype=np.float32)
+    
+    line_count = density * (1 + offset_v.size)
+    
+    # 每个采样点：主轴线点 + 垂直平面上的厚度网格点
+    if viz_kernels_available():
+        axis_line_points_kernel(center, perm[0], perm[1], perm[2], t, length,
+                                offset_v.ravel(), offset_w.ravel(), vertices[:line_count])
+    else:
+        line_points = np.zeros((density, 1 + offset_v.size, 3), dtype=np.float32)
+        line_points[:, :, 0] = (t * length)[:, None]
+        line_points[:, 1:, 1] = offset_v.ravel()
+        line_points[:, 1:, 2] = offset_w.ravel()
+        vertices[:line_count, perm] = line_points.reshape(-1, 3) + center[perm]
+    
+    # 箭头头部：在两个垂直方向上各取正负偏移
+    arrow_offset = (1 - arrow_t) * thickness * 2
+    arrow_points = np.zeros((len(arrow_t), 4, 3), dtype=np.float32)
+    arrow_points[:, :, 0] = (length * 0.9 + arrow_t * length * 0.1)[:, None]
+    arrow_points[:, 0, 1] = arrow_offset
+    arrow_points[:, 1, 1] = -arrow_offset
+    arrow_points[:, 2, 2] = arrow_offset
+    arrow_points[:, 3, 2] = -arrow_offset
+    vertices[line_count:, perm] = arrow_points.reshape(-1, 3) + center[perm]
+    
+    colors[:] = color
 
 
 class GLBPointCloudOriginAdjuster:
@@ -98,47 +250,60 @@ class GLBPointCloudOriginAdjuster:
             
             # 收集所有几何体和点云，考虑变换矩阵
             geometries_to_transform = []
-            all_vertices = []
+            # 逐几何体累积包围盒，避免拼接全部顶点
+            original_min = np.full(3, np.inf)
+            original_max = np.full(3, -np.inf)
             total_points = 0
             
+            # 逐几何体的日志仅在DEBUG级别记录，避免多几何体场景在循环中格式化大量字符串
+            log_geometry_details = logger.isEnabledFor(logging.DEBUG)
+            
             if isinstance(scene, trimesh.Scene):
-                for node_name in scene.graph.nodes:
-                    if node_name in scene.geometry:
-                        geometry = scene.geometry[node_name]
-                        transform_matrix = scene.graph[node_name][0]  # 获取变换矩阵
-                        geometries_to_transform.append((node_name, geometry))
-                        
-                        if hasattr(geometry, 'vertices') and geometry.vertices is not None:
-                            # 应用变换矩阵获取真实世界坐标
-                            if transform_matrix is not None and not np.allclose(transform_matrix, np.eye(4)):
-                                world_vertices = trimesh.transformations.transform_points(geometry.vertices, transform_matrix)
+                scene_nodes = _iter_scene(scene)
+                bounds_jobs = []
+                for node_name, geometry, transform_matrix in scene_nodes:
+                    geometries_to_transform.append((node_name, geometry))
+                    
+                    if hasattr(geometry, 'vertices') and geometry.vertices is not None:
+                        # 应用变换矩阵获取真实世界坐标
+                        if transform_matrix is not None and (transform_matrix != _IDENTITY4).any():
+                            bounds_jobs.append((geometry.vertices, transform_matrix))
+                            if log_geometry_details:
                                 processing_log.append(f"发现几何体: {node_name}, 顶点数: {len(geometry.vertices)}, 已应用变换矩阵")
-                            else:
-                                world_vertices = geometry.vertices.copy()
+                        else:
+                            bounds_jobs.append((geometry.vertices, None))
+                            if log_geometry_details:
                                 processing_log.append(f"发现几何体: {node_name}, 顶点数: {len(geometry.vertices)}, 无变换")
-                            
-                            all_vertices.append(world_vertices)
-                            total_points += len(geometry.vertices)
+                        
+                        total_points += len(geometry.vertices)
+                
+                # 各几何体相互独立，numpy路径会释放GIL，几何体较多时并行计算；
+                # numba内核自身已多核并行，且默认线程层不支持并发调用，此时串行执行
+                max_workers = 1 if _numba_kernels_ready() else min(8, len(bounds_jobs))
+                if len(bounds_jobs) > 4 and max_workers > 1:
+                    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                        geometry_bounds = list(executor.map(lambda job: _world_bounds(*job), bounds_jobs))
+                else:
+                    geometry_bounds = [_world_bounds(vertices, matrix) for vertices, matrix in bounds_jobs]
+                
+                for bounds_min, bounds_max in geometry_bounds:
+                    np.minimum(original_min, bounds_min, out=original_min)
+                    np.maximum(original_max, bounds_max, out=original_max)
             else:
                 # 单个几何体
                 geometries_to_transform.append(("main_geometry", scene))
-                if hasattr(scene, 'vertices') and scene.vertices is not None:
-                    all_vertices.append(scene.vertices)
+                if hasattr(scene, 'vertices') and scene.vertices is not None and len(scene.vertices) > 0:
+                    _update_bounds(np.asarray(scene.vertices), original_min, original_max)
                     total_points = len(scene.vertices)
                     processing_log.append(f"发现几何体: main_geometry, 顶点数: {total_points}")
             
-            if not all_vertices:
+            if total_points == 0:
                 error_msg = "GLB文件中没有可用的顶点数据"
                 processing_log.append(f"错误: {error_msg}")
                 return ("", "")
             
-            # 合并所有顶点计算包围盒（已经是世界坐标）
-            combined_vertices = np.vstack(all_vertices)
-            processing_log.append(f"总顶点数: {total_points:,} (已应用变换矩阵)")
-            
-            # 计算原始包围盒
-            original_min = np.min(combined_vertices, axis=0)
-            original_max = np.max(combined_vertices, axis=0)
+            # 原始包围盒（已经是世界坐标）
+            processing_log.append(f"几何体数: {len(geometries_to_transform)}, 总顶点数: {total_points:,} (已应用变换矩阵)")
             original_center = (original_min + original_max) / 2
             original_size = original_max - original_min
             
@@ -160,95 +325,39 @@ class GLBPointCloudOriginAdjuster:
             translation = -new_origin
             processing_log.append(f"平移向量: [{translation[0]:.6f}, {translation[1]:.6f}, {translation[2]:.6f}]")
             
-            # 创建平移变换矩阵（仅平移，无旋转）
-            transform_matrix = np.eye(4)
-            transform_matrix[:3, 3] = translation
-            
-            # 应用变换到所有几何体
-            new_scene = trimesh.Scene()
-            transformed_vertices_list = []
-            
-            for name, geometry in geometries_to_transform:
-                # 复制几何体
-                new_geometry = geometry.copy()
-                
-                # 应用变换
-                new_geometry.apply_transform(transform_matrix)
-                
-                # 添加到新场景
-                new_scene.add_geometry(new_geometry, node_name=name)
-                
-                # 收集变换后的顶点用于统计
-                if hasattr(new_geometry, 'vertices') and new_geometry.vertices is not None:
-                    transformed_vertices_list.append(new_geometry.vertices)
-                
-                processing_log.append(f"已变换几何体: {name}")
-            
-            # 添加坐标轴预览（在变换后的原点位置，即(0,0,0)）
-            if add_coordinate_axes:
-                try:
-                    # 计算变换后的包围盒来确定坐标轴长度
-                    if transformed_vertices_list:
-                        all_transformed_vertices = np.vstack(transformed_vertices_list)
-                        transformed_extents = np.max(all_transformed_vertices, axis=0) - np.min(all_transformed_vertices, axis=0)
-                        axis_length = np.max(transformed_extents) * 0.4
-                    else:
-                        axis_length = 1.0  # 默认长度
-                    
-                    # 在新的原点(0,0,0)处生成坐标轴
-                    axes_vertices, axes_colors = self._create_coordinate_axes_pointcloud_at_origin(
-                        axis_length, wireframe_density, processing_log
-                    )
-                    
-                    if len(axes_vertices) > 0:
-                        # 创建坐标轴点云
-                        axes_pointcloud = trimesh.PointCloud(vertices=axes_vertices, colors=axes_colors)
-                        new_scene.add_geometry(axes_pointcloud, node_name="coordinate_axes")
-                        processing_log.append(f"坐标轴预览: {len(axes_vertices):,} 个点 (显示新的原点位置)")
-                    
-                except Exception as e:
-                    processing_log.append(f"坐标轴生成失败: {str(e)}")
+            # 计算变换后的包围盒：纯平移下等于原始(世界坐标)包围盒加平移向量，无需再遍历顶点
+            new_min = original_min + translation
+            new_max = original_max + translation
+            new_center = (new_min + new_max) / 2
+            new_size = new_max - new_min
             
-            # 计算变换后的包围盒
-            if transformed_vertices_list:
-                transformed_vertices = np.vstack(transformed_vertices_list)
-                new_min = np.min(transformed_vertices, axis=0)
-                new_max = np.max(transformed_vertices, axis=0)
-                new_center = (new_min + new_max) / 2
-                new_size = new_max - new_min
-                
-                processing_log.append(f"变换后包围盒:")
-                processing_log.append(f"  最小点: [{new_min[0]:.6f}, {new_min[1]:.6f}, {new_min[2]:.6f}]")
-                processing_log.append(f"  最大点: [{new_max[0]:.6f}, {new_max[1]:.6f}, {new_max[2]:.6f}]")
-                processing_log.append(f"  中心点: [{new_center[0]:.6f}, {new_center[1]:.6f}, {new_center[2]:.6f}]")
-                processing_log.append(f"  尺寸: [{new_size[0]:.6f}, {new_size[1]:.6f}, {new_size[2]:.6f}]")
+            processing_log.append(f"变换后包围盒:")
+            processing_log.append(f"  最小点: [{new_min[0]:.6f}, {new_min[1]:.6f}, {new_min[2]:.6f}]")
+            processing_log.append(f"  最大点: [{new_max[0]:.6f}, {new_max[1]:.6f}, {new_max[2]:.6f}]")
+            processing_log.append(f"  中心点: [{new_center[0]:.6f}, {new_center[1]:.6f}, {new_center[2]:.6f}]")
+            processing_log.append(f"  尺寸: [{new_size[0]:.6f}, {new_size[1]:.6f}, {new_size[2]:.6f}]")
             
             # 生成带预览的输出文件（原模型数据不变，仅添加坐标轴预览）
             output_path = self._generate_output_path(output_filename)
             processing_log.append(f"输出文件路径: {output_path}")
             
             # 创建包含原始点云和坐标轴的预览场景，完全保持原始结构
-            original_scene = trimesh.load(input_path)  # 重新加载原始场景
-            
-            # 创建预览场景，完全复制原始场景的结构
-            if isinstance(original_scene, trimesh.Scene):
+            # （复用已加载的场景：上面只读取顶点统计包围盒，原场景未被修改）
+            if isinstance(scene, trimesh.Scene):
                 preview_scene = trimesh.Scene()
-                # 完全复制原始场景的所有几何体和变换矩阵
-                for node_name in original_scene.graph.nodes:
-                    if node_name in original_scene.geometry:
-                        geometry = original_scene.geometry[node_name]
-                        transform_matrix = original_scene.graph[node_name][0]  # 获取变换矩阵
-                        
-                        # 完全复制几何体，保持所有属性
-                        copied_geometry = geometry.copy()
-                        
-                        # 添加到预览场景，保持原始的变换矩阵
-                        preview_scene.add_geometry(copied_geometry, node_name=node_name, transform=transform_matrix)
+                # 引用原始场景的所有几何体和变换矩阵（预览场景只用于导出，不修改几何体，无需复制）
+                for node_name, geometry, transform_matrix in scene_nodes:
+                    # 添加到预览场景，保持原始的变换矩阵（显式命名，与此前复制几何体时的导出名称一致）
+                    geom_name = geometry.metadata.get("name", f"geometry_{len(preview_scene.geometry)}")
+                    preview_scene.add_geometry(geometry, node_name=node_name, geom_name=geom_name, transform=transform_matrix)
+                    if log_geometry_details:
                         processing_log.append(f"完全保持原始几何体: {node_name}, 变换矩阵和朝向已保留")
+                processing_log.append(f"完全保持原始几何体: {len(scene_nodes)} 个, 变换矩阵和朝向已保留")
             else:
                 # 单个几何体的情况
                 preview_scene = trimesh.Scene()
-                preview_scene.add_geometry(original_scene.copy(), node_name="main_geometry")
+                preview_scene.add_geometry(scene, node_name="main_geometry",
+                                           geom_name=scene.metadata.get("name", "geometry_0"))
                 processing_log.append("完全保持原始几何体: main_geometry, 所有属性已保留")
             
             # 添加坐标轴预览（如果需要）
@@ -318,8 +427,7 @@ class GLBPointCloudOriginAdjuster:
         
         # 尝试相对于ComfyUI输出目录
         if FOLDER_PATHS_AVAILABLE:
-            output_dir = folder_paths.get_output_directory()
-            candidate_path = os.path.join(output_dir, file_path)
+            candidate_path = os.path.join(cached_output_directory(), file_path)
             if os.path.exists(candidate_path):
                 return candidate_path
         
@@ -337,7 +445,7 @@ class GLBPointCloudOriginAdjuster:
             filename += '.glb'
         
         # 生成输出路径
-        output_dir = folder_paths.get_output_directory() if FOLDER_PATHS_AVAILABLE else "output"
+        output_dir = cached_output_directory()
         os.makedirs(output_dir, exist_ok=True)
         
         # 添加时间戳避免文件名冲突
@@ -355,109 +463,18 @@ class GLBPointCloudOriginAdjuster:
     def _create_coordinate_axes_pointcloud_at_position(self, position, axis_length, wireframe_density, processing_log):
         """在指定位置创建坐标轴的点云表示"""
         try:
-            center = np.array(position)  # 指定的位置
+            center = np.asarray(position, dtype=np.float64)  # 指定的位置
             axis_thickness = axis_length * 0.01  # 坐标轴厚度
-            axes_points = []
-            axes_colors = []
-            
-            # 计算坐标轴密度
-            axis_line_density = wireframe_density  # 使用参数控制密度
-            axis_thickness_points = max(3, axis_line_density // 15)  # 厚度方向的点数
-            
-            # X轴 - 红色（从指定位置开始）
-            for i in range(axis_line_density):
-                t = i / (axis_line_density - 1) if axis_line_density > 1 else 0
-                base_point = [center[0] + t * axis_length, center[1], center[2]]
-                
-                # 主轴线
-                axes_points.append(base_point)
-                axes_colors.append([255, 0, 0, 255])
-                
-                # 增加厚度（在YZ平面上添加点）
-                for j in range(axis_thickness_points):
-                    for k in range(axis_thickness_points):
-                        offset_y = (j - axis_thickness_points//2) * axis_thickness / axis_thickness_points
-                        offset_z = (k - axis_thickness_points//2) * axis_thickness / axis_thickness_points
-                        thick_point = [base_point[0], base_point[1] + offset_y, base_point[2] + offset_z]
-                        axes_points.append(thick_point)
-                        axes_colors.append([255, 0, 0, 255])
-            
-            # X轴箭头头部
-            arrow_length = axis_length * 0.1
-            arrow_base = axis_length * 0.9
-            for i in range(axis_line_density // 2):
-                t = i / (axis_line_density // 2 - 1) if axis_line_density > 2 else 0
-                arrow_x = center[0] + arrow_base + t * arrow_length
-                arrow_offset = (1 - t) * axis_thickness * 2
-                
-                axes_points.append([arrow_x, center[1] + arrow_offset, center[2]])
-                axes_points.append([arrow_x, center[1] - arrow_offset, center[2]])
-                axes_points.append([arrow_x, center[1], center[2] + arrow_offset])
-                axes_points.append([arrow_x, center[1], center[2] - arrow_offset])
-                axes_colors.extend([[255, 0, 0, 255]] * 4)
             
-            # Y轴 - 绿色（从指定位置开始）
-            for i in range(axis_line_density):
-                t = i / (axis_line_density - 1) if axis_line_density > 1 else 0
-                base_point = [center[0], center[1] + t * axis_length, center[2]]
-                
-                # 主轴线
-                axes_points.append(base_point)
-                axes_colors.append([0, 255, 0, 255])
-                
-                # 增加厚度（在XZ平面上添加点）
-                for j in range(axis_thickness_points):
-                    for k in range(axis_thickness_points):
-                        offset_x = (j - axis_thickness_points//2) * axis_thickness / axis_thickness_points
-                        offset_z = (k - axis_thickness_points//2) * axis_thickness / axis_thickness_points
-                        thick_point = [base_point[0] + offset_x, base_point[1], base_point[2] + offset_z]
-                        axes_points.append(thick_point)
-                        axes_colors.append([0, 255, 0, 255])
-            
-            # Y轴箭头头部
-            for i in range(axis_line_density // 2):
-                t = i / (axis_line_density // 2 - 1) if axis_line_density > 2 else 0
-                arrow_y = center[1] + arrow_base + t * arrow_length
-                arrow_offset = (1 - t) * axis_thickness * 2
-                
-                axes_points.append([center[0] + arrow_offset, arrow_y, center[2]])
-                axes_points.append([center[0] - arrow_offset, arrow_y, center[2]])
-                axes_points.append([center[0], arrow_y, center[2] + arrow_offset])
-                axes_points.append([center[0], arrow_y, center[2] - arrow_offset])
-                axes_colors.extend([[0, 255, 0, 255]] * 4)
-            
-            # Z轴 - 蓝色（从指定位置开始）
-            for i in range(axis_line_density):
-                t = i / (axis_line_density - 1) if axis_line_density > 1 else 0
-                base_point = [center[0], center[1], center[2] + t * axis_length]
-                
-                # 主轴线
-                axes_points.append(base_point)
-                axes_colors.append([0, 0, 255, 255])
-                
-                # 增加厚度（在XY平面上添加点）
-                for j in range(axis_thickness_points):
-                    for k in range(axis_thickness_points):
-                        offset_x = (j - axis_thickness_points//2) * axis_thickness / axis_thickness_points
-                        offset_y = (k - axis_thickness_points//2) * axis_thickness / axis_thickness_points
-                        thick_point = [base_point[0] + offset_x, base_point[1] + offset_y, base_point[2]]
-                        axes_points.append(thick_point)
-                        axes_colors.append([0, 0, 255, 255])
-            
-            # Z轴箭头头部
-            for i in range(axis_line_density // 2):
-                t = i / (axis_line_density // 2 - 1) if axis_line_density > 2 else 0
-                arrow_z = center[2] + arrow_base + t * arrow_length
-                arrow_offset = (1 - t) * axis_thickness * 2
-                
-                axes_points.append([center[0] + arrow_offset, center[1], arrow_z])
-                axes_points.append([center[0] - arrow_offset, center[1], arrow_z])
-                axes_points.append([center[0], center[1] + arrow_offset, arrow_z])
-                axes_points.append([center[0], center[1] - arrow_offset, arrow_z])
-                axes_colors.extend([[0, 0, 255, 255]] * 4)
-            
-            axes_vertices = np.array(axes_points)
-            axes_colors_array = np.array(axes_colors)
+            # X轴 - 红色，Y轴 - 绿色，Z轴 - 蓝色（粗线条）
+            # 三个轴写入同一组预分配缓冲区的连续区段
+            axis_count = _axis_point_count(wireframe_density)
+            axes_vertices = np.empty((3 * axis_count, 3), dtype=np.float32)
+            axes_colors_array = np.empty((3 * axis_count, 4), dtype=np.uint8)
+            for axis in range(3):
+                rows = slice(axis * axis_count, (axis + 1) * axis_count)
+                _build_axis(axis, center, axis_length, wireframe_density, axis_thickness, _AXIS_COLORS[axis],
+                            axes_vertices[rows], axes_colors_array[rows])
             
             processing_log.append(f"坐标轴生成: {len(axes_vertices):,} 个点 (长度={axis_length:.3f}, 密度={wireframe_density}, 位置=[{center[0]:.3f}, {center[1]:.3f}, {center[2]:.3f}])")
             
@@ -467,118 +484,3 @@ class GLBPointCloudOriginAdjuster:
             processing_log.append(f"创建坐标轴点云失败: {str(e)}")
             return np.array([]), np.array([])
 
-    def _create_coordinate_axes_pointcloud_at_origin(self, axis_length, wireframe_density, processing_log):
-        """在原点(0,0,0)创建坐标轴的点云表示"""
-        try:
-            origin_center = np.array([0.0, 0.0, 0.0])  # 新的原点位置
-            axis_thickness = axis_length * 0.01  # 坐标轴厚度
-            axes_points = []
-            axes_colors = []
-            
-            # 计算坐标轴密度
-            axis_line_density = wireframe_density  # 使用参数控制密度
-            axis_thickness_points = max(3, axis_line_density // 15)  # 厚度方向的点数
-            
-            # X轴 - 红色（从原点开始）
-            for i in range(axis_line_density):
-                t = i / (axis_line_density - 1) if axis_line_density > 1 else 0
-                base_point = [origin_center[0] + t * axis_length, origin_center[1], origin_center[2]]
-                
-                # 主轴线
-                axes_points.append(base_point)
-                axes_colors.append([255, 0, 0, 255])
-                
-                # 增加厚度（在YZ平面上添加点）
-                for j in range(axis_thickness_points):
-                    for k in range(axis_thickness_points):
-                        offset_y = (j - axis_thickness_points//2) * axis_thickness / axis_thickness_points
-                        offset_z = (k - axis_thickness_points//2) * axis_thickness / axis_thickness_points
-                        thick_point = [base_point[0], base_point[1] + offset_y, base_point[2] + offset_z]
-                        axes_points.append(thick_point)
-                        axes_colors.append([255, 0, 0, 255])
-            
-            # X轴箭头头部
-            arrow_length = axis_length * 0.1
-            arrow_base = axis_length * 0.9
-            for i in range(axis_line_density // 2):
-                t = i / (axis_line_density // 2 - 1) if axis_line_density > 2 else 0
-                arrow_x = origin_center[0] + arrow_base + t * arrow_length
-                arrow_offset = (1 - t) * axis_thickness * 2
-                
-                axes_points.append([arrow_x, origin_center[1] + arrow_offset, origin_center[2]])
-                axes_points.append([arrow_x, origin_center[1] - arrow_offset, origin_center[2]])
-                axes_points.append([arrow_x, origin_center[1], origin_center[2] + arrow_offset])
-                axes_points.append([arrow_x, origin_center[1], origin_center[2] - arrow_offset])
-                axes_colors.extend([[255, 0, 0, 255]] * 4)
-            
-            # Y轴 - 绿色（从原点开始）
-            for i in range(axis_line_density):
-                t = i / (axis_line_density - 1) if axis_line_density > 1 else 0
-                base_point = [origin_center[0], origin_center[1] + t * axis_length, origin_center[2]]
-                
-                # 主轴线
-                axes_points.append(base_point)
-                axes_colors.append([0, 255, 0, 255])
-                
-                # 增加厚度（在XZ平面上添加点）
-                for j in range(axis_thickness_points):
-                    for k in range(axis_thickness_points):
-                        offset_x = (j - axis_thickness_points//2) * axis_thickness / axis_thickness_points
-                        offset_z = (k - axis_thickness_points//2) * axis_thickness / axis_thickness_points
-                        thick_point = [base_point[0] + offset_x, base_point[1], base_point[2] + offset_z]
-                        axes_points.append(thick_point)
-                        axes_colors.append([0, 255, 0, 255])
-            
-            # Y轴箭头头部
-            for i in range(axis_line_density // 2):
-                t = i / (axis_line_density // 2 - 1) if axis_line_density > 2 else 0
-                arrow_y = origin_center[1] + arrow_base + t * arrow_length
-                arrow_offset = (1 - t) * axis_thickness * 2
-                
-                axes_points.append([origin_center[0] + arrow_offset, arrow_y, origin_center[2]])
-                axes_points.append([origin_center[0] - arrow_offset, arrow_y, origin_center[2]])
-                axes_points.append([origin_center[0], arrow_y, origin_center[2] + arrow_offset])
-                axes_points.append([origin_center[0], arrow_y, origin_center[2] - arrow_offset])
-                axes_colors.extend([[0, 255, 0, 255]] * 4)
-            
-            # Z轴 - 蓝色（从原点开始）
-            for i in range(axis_line_density):
-                t = i / (axis_line_density - 1) if axis_line_density > 1 else 0
-                base_point = [origin_center[0], origin_center[1], origin_center[2] + t * axis_length]
-                
-                # 主轴线
-                axes_points.append(base_point)
-                axes_colors.append([0, 0, 255, 255])
-                
-                # 增加厚度（在XY平面上添加点）
-                for j in range(axis_thickness_points):
-                    for k in range(axis_thickness_points):
-                        offset_x = (j - axis_thickness_points//2) * axis_thickness / axis_thickness_points
-                        offset_y = (k - axis_thickness_points//2) * axis_thickness / axis_thickness_points
-                        thick_point = [base_point[0] + offset_x, base_point[1] + offset_y, base_point[2]]
-                        axes_points.append(thick_point)
-                        axes_colors.append([0, 0, 255, 255])
-            
-            # Z轴箭头头部
-            for i in range(axis_line_density // 2):
-                t = i / (axis_line_density // 2 - 1) if axis_line_density > 2 else 0
-                arrow_z = origin_center[2] + arrow_base + t * arrow_length
-                arrow_offset = (1 - t) * axis_thickness * 2
-                
-                axes_points.append([origin_center[0] + arrow_offset, origin_center[1], arrow_z])
-                axes_points.append([origin_center[0] - arrow_offset, origin_center[1], arrow_z])
-                axes_points.append([origin_center[0], origin_center[1] + arrow_offset, arrow_z])
-                axes_points.append([origin_center[0], origin_center[1] - arrow_offset, arrow_z])
-                axes_colors.extend([[0, 0, 255, 255]] * 4)
-            
-            axes_vertices = np.array(axes_points)
-            axes_colors_array = np.array(axes_colors)
-            
-            processing_log.append(f"坐标轴生成: {len(axes_vertices):,} 个点 (长度={axis_length:.3f}, 密度={wireframe_density}, 原点=[0.000, 0.000, 0.000])")
-            
-            return axes_vertices, axes_colors_array
-            
-        except Exception as e:
-            processing_log.append(f"创建坐标轴点云失败: {str(e)}")
-            return np.array([]), np.array([])
-
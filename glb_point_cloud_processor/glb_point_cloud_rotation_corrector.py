@@ -1,5 +1,120 @@
 from .common import *
 
+# RANSAC批量评估时单批距离矩阵(点数 × 候选平面数)的元素上限，约16MB(float32)；
+# 超过一批时优先使用numba内核逐平面扫描，不分配距离矩阵
+_RANSAC_BATCH_ELEMENTS = 1 << 22
+
+# RANSAC自适应终止：每评估一组候选平面后按当前最佳内点比例 w 估计所需迭代次数
+# log(1 - p) / log(1 - w³)，已评估次数足够时提前结束
+_RANSAC_CHUNK_SIZE = 64
+_RANSAC_CONFIDENCE = 0.999
+
+_IDENTITY4 = np.eye(4)
+
+# 向上轴规格：(轴名称, 高度轴索引, 方向符号, 目标法向量)，每次处理只查表一次，未知取值按Z轴处理
+_UP_AXIS_SPECS = {
+    "Z": ("Z", 2, 1.0, np.array([0.0, 0.0, 1.0])),    # Z轴向上
+    "Y": ("Y", 1, 1.0, np.array([0.0, 1.0, 0.0])),    # Y轴向上
+    "-Y": ("-Y", 1, -1.0, np.array([0.0, -1.0, 0.0])),  # Y轴向下
+}
+
+
+def _vertex_bounds(vertices):
+    """求顶点数组的包围盒 (min, max)：numba可用时单次遍历同时得到最小/最大值；空数组与np.min一样抛出ValueError"""
+    if len(vertices) and _numba_kernels_ready():
+        bounds_min = np.empty(3)
+        bounds_max = np.empty(3)
+        chunks = min(numba.get_num_threads(), len(vertices))
+        _vertex_bounds_njit(np.ascontiguousarray(vertices, dtype=np.float64), chunks, bounds_min, bounds_max)
+        return bounds_min, bounds_max
+    return np.min(vertices, axis=0), np.max(vertices, axis=0)
+
+
+def _apply_affine(vertices, matrix, out=None):
+    """将4x4仿射矩阵应用到顶点：(N,3)·(3,3) 加平移，不构造齐次坐标；out 指定时直接写入该数组"""
+    world_vertices = np.matmul(vertices, matrix[:3, :3].T, out=out)
+    world_vertices += matrix[:3, 3]
+    return world_vertices
+
+
+def _write_world_vertices(vertices, transform_matrix, out):
+    """将几何体顶点的世界坐标写入 out：有非单位变换时做仿射变换，否则直接复制"""
+    if transform_matrix is not None and (transform_matrix != _IDENTITY4).any():
+        _apply_affine(vertices, transform_matrix, out=out)
+    else:
+        out[:] = vertices
+
+
+if NUMBA_AVAILABLE:
+    @numba.njit(parallel=True, fastmath=True, cache=True)
+    def _ransac_inlier_counts_njit(points, normals, offsets, threshold, counts):
+        """并行统计每个候选平面的内点数：每个线程处理一个平面，单次扫描全部点，不分配临时数组"""
+        n = points.shape[0]
+        for k in numba.prange(normals.shape[0]):
+            nx = normals[k, 0]
+            ny = normals[k, 1]
+            nz = normals[k, 2]
+            offset = offsets[k]
+            count = 0
+            for i in range(n):
+                distance = points[i, 0] * nx + points[i, 1] * ny + points[i, 2] * nz - offset
+                if abs(distance) <= threshold:
+                    count += 1
+            counts[k] = count
+
+    @numba.njit(parallel=True, fastmath=True, cache=True)
+    def _vertex_bounds_njit(vertices, chunks, bounds_min, bounds_max):
+        """单次遍历求顶点包围盒：分 chunks 块并行求各块极值，再串行归约到 bounds_min/bounds_max"""
+        n = vertices.shape[0]
+        chunk_min = np.empty((chunks, 3))
+        chunk_max = np.empty((chunks, 3))
+        for c in numba.prange(chunks):
+            start = c * n // chunks
+            end = (c + 1) * n // chunks
+            for d in range(3):
+                chunk_min[c, d] = vertices[start, d]
+                chunk_max[c, d] = vertices[start, d]
+            for i in range(start + 1, end):
+                for d in range(3):
+                    x = vertices[i, d]
+                    if x < chunk_min[c, d]:
+                        chunk_min[c, d] = x
+                    elif x > chunk_max[c, d]:
+                        chunk_max[c, d] = x
+        bounds_min[:] = chunk_min[0]
+        bounds_max[:] = chunk_max[0]
+        for c in range(1, chunks):
+            for d in range(3):
+                if chunk_min[c, d] < bounds_min[d]:
+                    bounds_min[d] = chunk_min[c, d]
+                if chunk_max[c, d] > bounds_max[d]:
+                    bounds_max[d] = chunk_max[c, d]
+
+    _f32 = np.float32
+
+    def _warm_up_numba_kernels():
+        """以最小输入调用各内核，触发编译或加载编译缓存"""
+        _ransac_inlier_counts_njit(np.zeros((1, 3), _f32), np.zeros((1, 3), _f32), np.zeros(1, _f32), _f32(1.0),
+                                   np.empty(1, dtype=np.int64))
+        _vertex_bounds_njit(np.zeros((1, 3)), 1, np.empty(3), np.empty(3))
+
+
+# numba内核在首次使用时才预热，不拖慢节点导入（cache=True时直接加载磁盘上的编译缓存）；None表示尚未预热
+_NUMBA_KERNELS_READY = None if NUMBA_AVAILABLE else False
+
+
+def _numba_kernels_ready():
+    """首次调用时预热numba内核并记录结果，返回内核是否可用；编译失败时回退到numpy实现"""
+    global _NUMBA_KERNELS_READY
+    if _NUMBA_KERNELS_READY is None:
+        try:
+            _warm_up_numba_kernels()
+            _NUMBA_KERNELS_READY = True
+        except Exception as e:
+            logger.warning(f"numba内核编译失败，回退到numpy实现: {e}")
+            _NUMBA_KERNELS_READY = False
+    return _NUMBA_KERNELS_READY
+
 
 class GLBPointCloudRotationCorrector:
     """GLB点云旋转校正器 - 检测地面倾斜并自动校正为水平，解决视频生成点云地面倾斜问题"""
@@ -116,8 +231,11 @@ class GLBPointCloudRotationCorrector:
             processing_log.append("正在加载GLB文件...")
             scene = trimesh.load(input_path)
             
-            # 收集所有顶点（考虑变换矩阵）
-            all_vertices = []
+            # 逐几何体的诊断信息与校正验证输出到 logger.debug，仅在DEBUG级别启用时计算，避免常规运行中的额外统计
+            log_details = logger.isEnabledFor(logging.DEBUG)
+            
+            # 收集所有带顶点的几何体及其变换矩阵
+            vertex_sources = []
             geometries_info = []
             
             if isinstance(scene, trimesh.Scene):
@@ -128,36 +246,41 @@ class GLBPointCloudRotationCorrector:
                         geometries_info.append((node_name, geometry, transform_matrix))
                         
                         if hasattr(geometry, 'vertices') and geometry.vertices is not None:
-                            # 应用变换矩阵获取世界坐标
-                            if transform_matrix is not None and not np.allclose(transform_matrix, np.eye(4)):
-                                world_vertices = trimesh.transformations.transform_points(geometry.vertices, transform_matrix)
-                            else:
-                                world_vertices = geometry.vertices.copy()
-                            
-                            all_vertices.append(world_vertices)
-                            processing_log.append(f"发现几何体: {node_name}, 顶点数: {len(geometry.vertices)}")
+                            vertex_sources.append((geometry.vertices, transform_matrix))
+                            logger.debug("发现几何体: %s, 顶点数: %d", node_name, len(geometry.vertices))
             else:
                 # 单个几何体
                 geometries_info.append(("main_geometry", scene, np.eye(4)))
                 if hasattr(scene, 'vertices') and scene.vertices is not None:
-                    all_vertices.append(scene.vertices)
+                    vertex_sources.append((scene.vertices, None))
                     processing_log.append(f"发现几何体: main_geometry, 顶点数: {len(scene.vertices)}")
             
-            if not all_vertices:
+            if not vertex_sources:
                 error_msg = "GLB文件中没有可用的顶点数据"
                 processing_log.append(f"错误: {error_msg}")
                 return ("", "")
             
-            # 合并所有顶点
-            combined_vertices = np.vstack(all_vertices)
+            # 预分配合并顶点数组，将每个几何体的世界坐标直接写入对应切片（考虑变换矩阵）
+            offsets = np.cumsum([0] + [len(vertices) for vertices, _ in vertex_sources])
+            combined_vertices = np.empty((offsets[-1], 3), dtype=np.float64)
+            fill_jobs = [(vertices, transform_matrix, combined_vertices[start:end])
+                         for (vertices, transform_matrix), start, end in zip(vertex_sources, offsets[:-1], offsets[1:])]
+            # 各几何体写入互不重叠的切片，几何体较多时使用线程池并行（numpy矩阵乘法释放GIL）
+            if len(fill_jobs) > 4:
+                with ThreadPoolExecutor(max_workers=min(8, len(fill_jobs))) as executor:
+                    list(executor.map(lambda job: _write_world_vertices(*job), fill_jobs))
+            else:
+                for job in fill_jobs:
+                    _write_world_vertices(*job)
             total_points = len(combined_vertices)
             processing_log.append(f"总顶点数: {total_points:,}")
             
             # 检测地面平面
+            axis_spec = _UP_AXIS_SPECS.get(up_axis, _UP_AXIS_SPECS["Z"])
             processing_log.append(f"开始地面检测，方法: {ground_detection_method}, 向上轴: {up_axis}")
             ground_normal, ground_point, ground_indices, detection_info = self._detect_ground_plane(
                 combined_vertices, ground_detection_method, ground_height_percentile,
-                ransac_iterations, ransac_threshold, min_ground_points, up_axis, processing_log
+                ransac_iterations, ransac_threshold, min_ground_points, axis_spec, processing_log
             )
             
             if ground_normal is None:
@@ -172,7 +295,7 @@ class GLBPointCloudRotationCorrector:
             # 计算旋转变换
             processing_log.append("计算旋转变换...")
             rotation_matrix, rotation_angles, transform_matrix = self._calculate_rotation_transform(
-                ground_normal, ground_point, up_axis, processing_log
+                ground_normal, ground_point, axis_spec, processing_log
             )
             
             processing_log.append(f"旋转角度 (度): X={np.degrees(rotation_angles[0]):.2f}, Y={np.degrees(rotation_angles[1]):.2f}, Z={np.degrees(rotation_angles[2]):.2f}")
@@ -180,12 +303,12 @@ class GLBPointCloudRotationCorrector:
             # 应用旋转变换到所有几何体
             processing_log.append("应用旋转变换...")
             corrected_scene = self._apply_rotation_transform(
-                scene, geometries_info, transform_matrix, processing_log
+                scene, geometries_info, transform_matrix, log_details, processing_log
             )
             
-            # 验证校正结果：检查校正后的地面是否水平
-            processing_log.append("验证校正结果...")
-            self._verify_correction_result(corrected_scene, processing_log)
+            # 验证校正结果：检查校正后的地面是否水平（结果输出到DEBUG日志）
+            if log_details:
+                self._verify_correction_result(corrected_scene, axis_spec)
             
             # 添加参考平面可视化（如果需要）
             if add_reference_plane:
@@ -242,61 +365,49 @@ class GLBPointCloudRotationCorrector:
             return ("", "")
     
     def _detect_ground_plane(self, vertices, method, height_percentile, ransac_iterations, 
-                           ransac_threshold, min_ground_points, up_axis, processing_log):
+                           ransac_threshold, min_ground_points, axis_spec, processing_log):
         """检测地面平面"""
         
-        # 首先分析点云的分布情况
-        min_coords = np.min(vertices, axis=0)
-        max_coords = np.max(vertices, axis=0)
+        # 首先分析点云的分布情况（包围盒只计算一次，下面各检测方法的轴向极值直接复用）
+        min_coords, max_coords = _vertex_bounds(vertices)
         ranges = max_coords - min_coords
         processing_log.append(f"点云包围盒: X=[{min_coords[0]:.3f}, {max_coords[0]:.3f}], Y=[{min_coords[1]:.3f}, {max_coords[1]:.3f}], Z=[{min_coords[2]:.3f}, {max_coords[2]:.3f}]")
         processing_log.append(f"各轴范围: X={ranges[0]:.3f}, Y={ranges[1]:.3f}, Z={ranges[2]:.3f}")
         
-        # 根据up_axis确定高度轴索引
-        if up_axis == "Z":
-            height_axis = 2  # Z轴
-            axis_name = "Z"
-        elif up_axis == "Y":
-            height_axis = 1  # Y轴
-            axis_name = "Y"
-        elif up_axis == "-Y":
-            height_axis = 1  # Y轴，但方向相反
-            axis_name = "-Y"
-        else:
-            height_axis = 2  # 默认Z轴
-            axis_name = "Z"
+        # 高度轴索引与方向（-Y 为Y轴但方向相反）
+        up_axis_name, height_axis, axis_sign, target_normal = axis_spec
         
-        processing_log.append(f"使用 {axis_name} 轴作为高度轴")
+        processing_log.append(f"使用 {up_axis_name} 轴作为高度轴")
         
         if method == "lowest_plane":
             # 最低平面检测方法（推荐）
             processing_log.append("使用最低平面检测方法")
             
-            # 找到最低的点集
+            # 找到最低的点集：极值直接复用上面的包围盒，只需一次比较遍历生成掩码
             height_values = vertices[:, height_axis]
-            if up_axis == "-Y":
-                # 如果Y轴向下，我们需要找最高的点作为地面
-                height_min = np.max(height_values)
-                ground_mask = height_values >= (height_min - ranges[height_axis] * 0.05)
-            else:
+            
+            def select_ground(tolerance):
+                if axis_sign < 0:
+                    # 如果Y轴向下，我们需要找最高的点作为地面
+                    return vertices[height_values >= (height_min - tolerance)]
                 # 正常情况，找最低的点
-                height_min = np.min(height_values)
-                ground_mask = height_values <= (height_min + ranges[height_axis] * 0.05)
+                return vertices[height_values <= (height_min + tolerance)]
+            
+            height_min = max_coords[height_axis] if axis_sign < 0 else min_coords[height_axis]
             
             # 使用更严格的高度阈值来找地面
             height_tolerance = ranges[height_axis] * 0.05  # 5%的高度容差
-            ground_candidates = vertices[ground_mask]
+            ground_candidates = select_ground(height_tolerance)
             
-            processing_log.append(f"最低点高度({axis_name}): {height_min:.4f}")
+            processing_log.append(f"最低点高度({up_axis_name}): {height_min:.4f}")
             processing_log.append(f"高度容差: {height_tolerance:.4f}")
             processing_log.append(f"地面候选点: {len(ground_candidates):,} 个")
             
             if len(ground_candidates) < min_ground_points:
                 processing_log.append(f"地面候选点不足，尝试扩大搜索范围")
                 # 扩大搜索范围
-                height_tolerance = ranges[2] * 0.1  # 10%的高度容差
-                ground_mask = z_values <= (z_min + height_tolerance)
-                ground_candidates = vertices[ground_mask]
+                height_tolerance = ranges[height_axis] * 0.1  # 10%的高度容差
+                ground_candidates = select_ground(height_tolerance)
                 processing_log.append(f"扩大后地面候选点: {len(ground_candidates):,} 个")
                 
                 if len(ground_candidates) < min_ground_points:
@@ -314,8 +425,8 @@ class GLBPointCloudRotationCorrector:
             
             # 计算高度范围
             z_values = vertices[:, 2]  # 假设Z是高度轴
-            z_min = np.min(z_values)
-            z_max = np.max(z_values)
+            z_min = min_coords[2]
+            z_max = max_coords[2]
             z_range = z_max - z_min
             
             processing_log.append(f"高度范围: {z_min:.4f} ~ {z_max:.4f} (范围: {z_range:.4f})")
@@ -348,9 +459,9 @@ class GLBPointCloudRotationCorrector:
                 
                 # 使用当前轴作为高度
                 axis_values = vertices[:, axis_idx]
-                min_val = np.min(axis_values)
-                max_val = np.max(axis_values)
-                range_val = max_val - min_val
+                min_val = min_coords[axis_idx]
+                max_val = max_coords[axis_idx]
+                range_val = ranges[axis_idx]
                 
                 processing_log.append(f"{axis_name}轴范围: {min_val:.4f} ~ {max_val:.4f} (范围: {range_val:.4f})")
                 
@@ -389,7 +500,7 @@ class GLBPointCloudRotationCorrector:
             processing_log.append("使用简化测试模式")
             
             z_values = vertices[:, 2]
-            z_min = np.min(z_values)
+            z_min = min_coords[2]
             height_tolerance = ranges[2] * 0.1
             ground_mask = z_values <= (z_min + height_tolerance)
             ground_candidates = vertices[ground_mask]
@@ -397,10 +508,10 @@ class GLBPointCloudRotationCorrector:
             processing_log.append(f"简化测试：选择最低10%的点作为地面: {len(ground_candidates):,} 个")
             
             if len(ground_candidates) >= 3:
-                # 使用PCA找主方向
+                # 使用PCA找主方向：直接由 d.T @ d 得到3x3协方差矩阵（与np.cov相同的无偏归一化）
                 centroid = np.mean(ground_candidates, axis=0)
                 centered = ground_candidates - centroid
-                cov_matrix = np.cov(centered.T)
+                cov_matrix = (centered.T @ centered) / max(len(ground_candidates) - 1, 1)
                 eigenvalues, eigenvectors = np.linalg.eigh(cov_matrix)
                 
                 # 最小特征值对应的特征向量就是法向量
@@ -432,15 +543,9 @@ class GLBPointCloudRotationCorrector:
             return None, None, None, {}
         
         # 确保法向量向上 (如果法向量向下，翻转它)
-        if up_axis == "Z" and best_normal[2] < 0:
-            best_normal = -best_normal
-            processing_log.append("法向量已翻转为向上方向(Z轴)")
-        elif up_axis == "Y" and best_normal[1] < 0:
+        if axis_sign * best_normal[height_axis] < 0:
             best_normal = -best_normal
-            processing_log.append("法向量已翻转为向上方向(Y轴)")
-        elif up_axis == "-Y" and best_normal[1] > 0:
-            best_normal = -best_normal
-            processing_log.append("法向量已翻转为向下方向(-Y轴)")
+            processing_log.append(f"法向量已翻转为{'向上' if axis_sign > 0 else '向下'}方向({up_axis_name}轴)")
         
         # 调试信息：输出检测到的法向量
         processing_log.append(f"最终地面法向量: [{best_normal[0]:.4f}, {best_normal[1]:.4f}, {best_normal[2]:.4f}]")
@@ -450,18 +555,8 @@ class GLBPointCloudRotationCorrector:
         processing_log.append(f"法向量模长: {normal_magnitude:.4f}")
         
         # 计算法向量与垂直向量的夹角
-        if up_axis == "Z":
-            vertical_angle = np.arccos(np.clip(best_normal[2], -1.0, 1.0))
-            axis_label = "(0,0,1)"
-        elif up_axis == "Y":
-            vertical_angle = np.arccos(np.clip(best_normal[1], -1.0, 1.0))
-            axis_label = "(0,1,0)"
-        elif up_axis == "-Y":
-            vertical_angle = np.arccos(np.clip(-best_normal[1], -1.0, 1.0))
-            axis_label = "(0,-1,0)"
-        else:
-            vertical_angle = np.arccos(np.clip(best_normal[2], -1.0, 1.0))
-            axis_label = "(0,0,1)"
+        vertical_angle = np.arccos(np.clip(axis_sign * best_normal[height_axis], -1.0, 1.0))
+        axis_label = "({:d},{:d},{:d})".format(*target_normal.astype(int))
             
         processing_log.append(f"地面法向量与垂直轴{axis_label}的夹角: {np.degrees(vertical_angle):.2f} 度")
         
@@ -489,104 +584,117 @@ class GLBPointCloudRotationCorrector:
         original_point_count = len(points)
         max_ransac_points = 50000  # RANSAC处理的最大点数
         
+        rng = np.random.default_rng(42)  # 独立的随机数生成器，确保结果可重现（包括采样）
+        
         if len(points) > max_ransac_points:
-            # 采样点云进行RANSAC
-            sample_indices = np.random.choice(len(points), max_ransac_points, replace=False)
+            # 采样点云进行RANSAC：Generator.choice 对大点云使用Floyd采样（无需N长度的索引缓冲区），
+            # 采样结果无需打乱，排序后按内存顺序取点
+            sample_indices = rng.choice(len(points), max_ransac_points, replace=False, shuffle=False)
+            sample_indices.sort()
             ransac_points = points[sample_indices]
             processing_log.append(f"RANSAC采样: 从 {original_point_count:,} 个点中采样 {max_ransac_points:,} 个点进行拟合")
         else:
             ransac_points = points
             sample_indices = None
         
-        best_inliers = []
-        best_normal = None
-        best_point = None
-        best_score = 0
-        
         processing_log.append(f"开始RANSAC平面拟合: {len(ransac_points):,} 个点, {max_iterations} 次迭代")
         
-        np.random.seed(42)  # 确保结果可重现
-        
-        for iteration in range(max_iterations):
-            # 随机选择3个点
-            point_sample_indices = np.random.choice(len(ransac_points), 3, replace=False)
-            sample_points = ransac_points[point_sample_indices]
-            
-            # 计算平面法向量
-            v1 = sample_points[1] - sample_points[0]
-            v2 = sample_points[2] - sample_points[0]
-            normal = np.cross(v1, v2)
-            
-            # 标准化法向量
-            normal_length = np.linalg.norm(normal)
-            if normal_length < 1e-8:
-                continue  # 三点共线，跳过
-            normal = normal / normal_length
-            
-            # 平面上的参考点
-            plane_point = sample_points[0]
-            
-            # 计算所有RANSAC点到平面的距离
-            distances = np.abs(np.dot(ransac_points - plane_point, normal))
-            
-            # 统计内点
-            inliers = distances <= distance_threshold
-            inlier_count = np.sum(inliers)
-            
-            # 更新最佳结果
-            if inlier_count > best_score:
-                best_score = inlier_count
-                best_normal = normal.copy()
-                best_point = plane_point.copy()
-                best_inliers = np.where(inliers)[0]
+        # 一次性为所有迭代随机选择3个点，批量计算候选平面（法向量 + 平面方程偏移）
+        triplets = ransac_points[rng.integers(0, len(ransac_points), size=(max_iterations, 3))]
+        normals = np.cross(triplets[:, 1] - triplets[:, 0], triplets[:, 2] - triplets[:, 0])
+        normal_lengths = np.linalg.norm(normals, axis=1)
+        valid = normal_lengths >= 1e-8  # 三点共线（或重复）的候选平面无效
+        normals[valid] /= normal_lengths[valid, None]
+        
+        # 评分阶段使用float32（厘米级距离阈值无需float64精度）以减半内存带宽，先平移到点云中心附近以保留远离原点坐标的精度；
+        # 候选平面仍由float64计算，最终内点筛选与精细拟合使用float64
+        center = ransac_points.mean(axis=0)
+        points32 = np.empty(ransac_points.shape, dtype=np.float32)
+        np.subtract(ransac_points, center, out=points32, casting='same_kind')
+        normals32 = normals.astype(np.float32)
+        offsets32 = np.einsum('ki,ki->k', normals, triplets[:, 0] - center).astype(np.float32)
+        threshold32 = np.float32(distance_threshold)
+        
+        inlier_counts = np.zeros(max_iterations, dtype=np.int64)
+        use_kernel = _numba_kernels_ready() and len(ransac_points) * max_iterations > _RANSAC_BATCH_ELEMENTS
+        batch_size = min(max(1, _RANSAC_BATCH_ELEMENTS // len(ransac_points)), _RANSAC_CHUNK_SIZE)
+        if not use_kernel:
+            # 距离矩阵(候选平面数 × 点数)与内点掩码缓冲区只分配一次，各批次通过 out= 原地复用
+            distance_buffer = np.empty((batch_size, len(ransac_points)), dtype=np.float32)
+            mask_buffer = np.empty(distance_buffer.shape, dtype=bool)
+        evaluated = 0
+        for chunk_start in range(0, max_iterations, _RANSAC_CHUNK_SIZE):
+            chunk_end = min(chunk_start + _RANSAC_CHUNK_SIZE, max_iterations)
+            if use_kernel:
+                # 大规模评估：numba内核并行逐平面扫描
+                _ransac_inlier_counts_njit(points32, normals32[chunk_start:chunk_end], offsets32[chunk_start:chunk_end],
+                                           threshold32, inlier_counts[chunk_start:chunk_end])
+            else:
+                # 分批用矩阵乘法计算所有点到候选平面的距离并统计内点数，限制距离矩阵的内存占用
+                for start in range(chunk_start, chunk_end, batch_size):
+                    end = min(start + batch_size, chunk_end)
+                    distances = distance_buffer[:end - start]
+                    inlier_mask = mask_buffer[:end - start]
+                    np.matmul(normals32[start:end], points32.T, out=distances)
+                    distances -= offsets32[start:end, None]
+                    np.abs(distances, out=distances)
+                    np.less_equal(distances, threshold32, out=inlier_mask)
+                    inlier_counts[start:end] = np.count_nonzero(inlier_mask, axis=1)
+            inlier_counts[chunk_start:chunk_end][~valid[chunk_start:chunk_end]] = 0
+            evaluated = chunk_end
+            
+            # 自适应终止：内点比例足够高时，已评估的候选平面数已满足置信度要求
+            inlier_ratio = inlier_counts[:evaluated].max() / len(ransac_points)
+            if inlier_ratio > 0.1:
+                required_iterations = np.log(1 - _RANSAC_CONFIDENCE) / np.log(1 - inlier_ratio ** 3 + 1e-12)
+                if evaluated >= required_iterations and evaluated < max_iterations:
+                    processing_log.append(f"RANSAC提前终止: 已评估 {evaluated}/{max_iterations} 次迭代 (内点比例: {inlier_ratio:.1%})")
+                    break
+        
+        # 选择内点最多的候选平面（并列时取最早的迭代）
+        best_iteration = int(np.argmax(inlier_counts[:evaluated]))
+        best_score = int(inlier_counts[best_iteration])
+        best_normal = normals[best_iteration].copy()
+        best_point = triplets[best_iteration, 0].copy()
         
         if best_score < min_points:
             processing_log.append(f"RANSAC拟合失败: 最佳结果仅有 {best_score} 个内点")
             return None, None, None, {}
         
+        # 最佳平面的距离只计算一次：采样时直接在原始点集上计算，采样点的内点由同一掩码取出
+        # 距离按 p·n - p0·n 计算，不分配 (N,3) 的 points - best_point 临时数组
+        distances = (points if sample_indices is not None else ransac_points) @ best_normal
+        distances -= np.dot(best_point, best_normal)
+        np.abs(distances, out=distances)
+        all_inliers_mask = distances <= distance_threshold
+        if sample_indices is not None:
+            best_inliers = np.flatnonzero(all_inliers_mask[sample_indices])
+        else:
+            best_inliers = np.flatnonzero(all_inliers_mask)
+        
         # 使用内点重新拟合平面（提高精度）
         if len(best_inliers) >= 3:
-            # 如果使用了采样，需要映射回原始点集的内点
+            # 如果使用了采样，使用原始点集中的全部内点
             if sample_indices is not None:
-                # 将采样点的内点索引映射回原始点集
-                ransac_inlier_points = ransac_points[best_inliers]
-                
-                # 在原始点集中找到对应的内点 
-                # 重新在所有原始点上应用最佳平面进行筛选
-                all_distances = np.abs(np.dot(points - best_point, best_normal))
-                all_inliers_mask = all_distances <= distance_threshold
                 inlier_points = points[all_inliers_mask]
                 
-                processing_log.append(f"重新筛选原始点集: {np.sum(all_inliers_mask):,} 个内点")
+                processing_log.append(f"重新筛选原始点集: {np.count_nonzero(all_inliers_mask):,} 个内点")
             else:
                 inlier_points = ransac_points[best_inliers]
             centroid = np.mean(inlier_points, axis=0)
             
-            # 对于大规模点云，限制SVD使用的点数以避免内存问题
-            max_svd_points = 10000  # 限制SVD使用的最大点数
-            if len(inlier_points) > max_svd_points:
-                # 随机采样代表性点
-                sample_indices = np.random.choice(len(inlier_points), max_svd_points, replace=False)
-                sampled_points = inlier_points[sample_indices]
-                processing_log.append(f"SVD拟合采样: 从 {len(inlier_points):,} 个内点中采样 {max_svd_points:,} 个点")
-            else:
-                sampled_points = inlier_points
-            
             try:
-                # 使用SVD进行更精确的平面拟合
-                centered_points = sampled_points - centroid
-                U, S, Vt = np.linalg.svd(centered_points)
-                refined_normal = Vt[-1]  # 最小奇异值对应的向量
+                # 使用全部内点的3x3协方差矩阵做特征分解进行精细平面拟合
+                # （一次N×3遍历 + 常数时间eigh，无需对内点降采样）
+                centered_points = inlier_points - centroid
+                eigenvalues, eigenvectors = np.linalg.eigh(centered_points.T @ centered_points)
+                refined_normal = eigenvectors[:, 0]  # 最小特征值对应的向量（eigh按升序返回）
                 
                 best_normal = refined_normal
                 best_point = centroid
-                processing_log.append(f"SVD精细拟合完成，使用 {len(sampled_points):,} 个点")
-            except np.core._exceptions._ArrayMemoryError as e:
-                processing_log.append(f"SVD内存不足，使用原始RANSAC结果: {str(e)}")
-                # 保持原始RANSAC结果
-                pass
+                processing_log.append(f"协方差精细拟合完成，使用 {len(inlier_points):,} 个点")
             except Exception as e:
-                processing_log.append(f"SVD拟合失败，使用原始RANSAC结果: {str(e)}")
+                processing_log.append(f"精细拟合失败，使用原始RANSAC结果: {str(e)}")
                 # 保持原始RANSAC结果
                 pass
         
@@ -594,7 +702,7 @@ class GLBPointCloudRotationCorrector:
         final_inlier_count = len(inlier_points) if len(best_inliers) >= 3 else best_score
         
         ransac_info = {
-            "iterations": max_iterations,
+            "iterations": evaluated,
             "best_inliers_count": final_inlier_count,
             "inlier_ratio": final_inlier_count / original_point_count,
             "distance_threshold": distance_threshold,
@@ -607,22 +715,11 @@ class GLBPointCloudRotationCorrector:
         
         return best_normal, best_point, best_inliers, ransac_info
     
-    def _calculate_rotation_transform(self, ground_normal, ground_point, up_axis, processing_log):
+    def _calculate_rotation_transform(self, ground_normal, ground_point, axis_spec, processing_log):
         """计算将地面法向量对齐到指定向上轴的旋转变换"""
         
-        # 根据up_axis设置目标法向量
-        if up_axis == "Z":
-            target_normal = np.array([0.0, 0.0, 1.0])  # Z轴向上
-            height_axis = 2
-        elif up_axis == "Y":
-            target_normal = np.array([0.0, 1.0, 0.0])  # Y轴向上
-            height_axis = 1
-        elif up_axis == "-Y":
-            target_normal = np.array([0.0, -1.0, 0.0])  # Y轴向下
-            height_axis = 1
-        else:
-            target_normal = np.array([0.0, 0.0, 1.0])  # 默认Z轴向上
-            height_axis = 2
+        # 向上轴规格给出目标法向量与高度轴
+        _, height_axis, _, target_normal = axis_spec
         
         # 标准化输入法向量
         ground_normal = ground_normal / np.linalg.norm(ground_normal)
@@ -686,21 +783,20 @@ class GLBPointCloudRotationCorrector:
                     # 180度旋转
                     rotation_matrix = 2 * np.outer(rotation_axis, rotation_axis) - np.eye(3)
             else:
-                # 一般情况：使用罗德里格公式
-                rotation_axis = rotation_axis / rotation_axis_length
-                rotation_angle = np.arccos(np.clip(dot_product, -1.0, 1.0))
-                
-                # 罗德里格公式
+                # 一般情况：使用罗德里格公式的闭式形式
+                # 直接用未归一化的旋转轴 v = n × t 构造叉乘矩阵 K（|v| = sinθ，n·t = cosθ），
+                # R = I + K + K² · (1 - cosθ) / sin²θ，无需先求角度再计算sin/cos
+                v = rotation_axis
                 K = np.array([
-                    [0, -rotation_axis[2], rotation_axis[1]],
-                    [rotation_axis[2], 0, -rotation_axis[0]],
-                    [-rotation_axis[1], rotation_axis[0], 0]
+                    [0, -v[2], v[1]],
+                    [v[2], 0, -v[0]],
+                    [-v[1], v[0], 0]
                 ])
                 
-                rotation_matrix = (np.eye(3) + 
-                                 np.sin(rotation_angle) * K + 
-                                 (1 - np.cos(rotation_angle)) * np.dot(K, K))
+                rotation_matrix = np.eye(3) + K + (K @ K) * ((1.0 - dot_product) / (rotation_axis_length * rotation_axis_length))
                 
+                rotation_axis = rotation_axis / rotation_axis_length
+                rotation_angle = np.arctan2(rotation_axis_length, dot_product)  # 仅用于日志
                 processing_log.append(f"使用罗德里格公式: 旋转轴=[{rotation_axis[0]:.4f}, {rotation_axis[1]:.4f}, {rotation_axis[2]:.4f}], 角度={np.degrees(rotation_angle):.2f}度")
             
             # 从旋转矩阵提取欧拉角
@@ -752,64 +848,76 @@ class GLBPointCloudRotationCorrector:
         
         return np.array([x, y, z])
     
-    def _apply_rotation_transform(self, scene, geometries_info, transform_matrix, processing_log):
-        """应用旋转变换到场景中的所有几何体"""
+    def _apply_rotation_transform(self, scene, geometries_info, transform_matrix, log_details, processing_log):
+        """应用旋转变换到场景中的所有几何体，log_details 为 True 时以DEBUG级别输出逐几何体信息及其包围盒统计"""
         
         corrected_scene = trimesh.Scene()
         
+        # 先确定每个几何体的完整变换：原始变换与校正变换合并为一个矩阵，顶点只需做一次仿射变换
+        vertex_jobs = []
         for name, geometry, original_transform in geometries_info:
+            if not (hasattr(geometry, 'vertices') and geometry.vertices is not None):
+                vertex_jobs.append(None)
+                continue
+            
+            # 如果几何体之前有变换，先应用原始变换
+            if original_transform is not None and not np.array_equal(original_transform, _IDENTITY4):
+                # 将3x4变换扩展为4x4
+                if original_transform.shape == (3, 4):
+                    full_original_transform = np.eye(4)
+                    full_original_transform[:3, :] = original_transform
+                else:
+                    full_original_transform = original_transform
+                
+                vertex_jobs.append((geometry.vertices, transform_matrix @ full_original_transform))
+                if log_details:
+                    logger.debug("几何体 %s: 应用原始变换 -> 世界坐标", name)
+                    before_bounds = _vertex_bounds(_apply_affine(geometry.vertices, full_original_transform))
+            else:
+                vertex_jobs.append((geometry.vertices, transform_matrix))
+                if log_details:
+                    logger.debug("几何体 %s: 无原始变换，直接使用顶点", name)
+                    before_bounds = _vertex_bounds(geometry.vertices)
+            
+            if log_details:
+                logger.debug("几何体 %s 变换前包围盒: Z=%.3f~%.3f", name, before_bounds[0][2], before_bounds[1][2])
+        
+        # 各几何体的顶点变换相互独立（numpy矩阵乘法释放GIL），几何体较多时使用线程池并行
+        transform_jobs = [job for job in vertex_jobs if job is not None]
+        if len(transform_jobs) > 4:
+            with ThreadPoolExecutor(max_workers=min(8, len(transform_jobs))) as executor:
+                transformed = iter(list(executor.map(lambda job: _apply_affine(*job), transform_jobs)))
+        else:
+            transformed = iter([_apply_affine(vertices, matrix) for vertices, matrix in transform_jobs])
+        
+        for (name, geometry, _), job in zip(geometries_info, vertex_jobs):
             # 复制几何体
             new_geometry = geometry.copy()
             
-            # 先重置任何现有的变换，然后应用校正变换
-            if hasattr(new_geometry, 'vertices') and new_geometry.vertices is not None:
-                # 获取原始顶点
-                original_vertices = geometry.vertices.copy()
-                
-                # 如果几何体之前有变换，先应用原始变换
-                if original_transform is not None and not np.allclose(original_transform, np.eye(4)):
-                    # 将3x4变换扩展为4x4
-                    if original_transform.shape == (3, 4):
-                        full_original_transform = np.eye(4)
-                        full_original_transform[:3, :] = original_transform
-                    else:
-                        full_original_transform = original_transform
-                    
-                    # 应用原始变换
-                    world_vertices = trimesh.transformations.transform_points(original_vertices, full_original_transform)
-                    processing_log.append(f"几何体 {name}: 应用原始变换 -> 世界坐标")
-                else:
-                    world_vertices = original_vertices
-                    processing_log.append(f"几何体 {name}: 无原始变换，直接使用顶点")
-                
-                # 应用校正变换到世界坐标
-                corrected_vertices = trimesh.transformations.transform_points(world_vertices, transform_matrix)
-                
+            if job is not None:
                 # 更新几何体顶点
-                new_geometry.vertices = corrected_vertices
+                new_geometry.vertices = next(transformed)
                 
                 # 验证变换结果
-                before_bounds = np.array([np.min(world_vertices, axis=0), np.max(world_vertices, axis=0)])
-                after_bounds = np.array([np.min(corrected_vertices, axis=0), np.max(corrected_vertices, axis=0)])
-                
-                processing_log.append(f"几何体 {name} 变换前包围盒: Z={before_bounds[0][2]:.3f}~{before_bounds[1][2]:.3f}")
-                processing_log.append(f"几何体 {name} 变换后包围盒: Z={after_bounds[0][2]:.3f}~{after_bounds[1][2]:.3f}")
+                if log_details:
+                    after_bounds = _vertex_bounds(new_geometry.vertices)
+                    logger.debug("几何体 %s 变换后包围盒: Z=%.3f~%.3f", name, after_bounds[0][2], after_bounds[1][2])
             else:
                 # 如果没有顶点，直接应用变换
                 new_geometry.apply_transform(transform_matrix)
-                processing_log.append(f"几何体 {name}: 应用变换矩阵")
+                logger.debug("几何体 %s: 应用变换矩阵", name)
             
             # 添加到新场景（不带额外变换）
             corrected_scene.add_geometry(new_geometry, node_name=name)
             
-            processing_log.append(f"已校正几何体: {name}")
+            logger.debug("已校正几何体: %s", name)
         
-        processing_log.append(f"所有几何体已应用旋转校正")
+        processing_log.append(f"所有几何体已应用旋转校正: {len(geometries_info)} 个")
         
         return corrected_scene
     
-    def _verify_correction_result(self, corrected_scene, processing_log):
-        """验证校正结果是否正确"""
+    def _verify_correction_result(self, corrected_scene, axis_spec):
+        """验证校正结果是否正确，结果以DEBUG级别输出到日志"""
         
         # 收集校正后的所有顶点
         all_corrected_vertices = []
@@ -826,18 +934,21 @@ class GLBPointCloudRotationCorrector:
             combined_corrected = np.vstack(all_corrected_vertices)
             
             # 分析校正后的点云分布
-            min_coords = np.min(combined_corrected, axis=0)
-            max_coords = np.max(combined_corrected, axis=0)
+            min_coords, max_coords = _vertex_bounds(combined_corrected)
             ranges = max_coords - min_coords
             
-            processing_log.append(f"校正后包围盒: X=[{min_coords[0]:.3f}, {max_coords[0]:.3f}], Y=[{min_coords[1]:.3f}, {max_coords[1]:.3f}], Z=[{min_coords[2]:.3f}, {max_coords[2]:.3f}]")
-            processing_log.append(f"校正后各轴范围: X={ranges[0]:.3f}, Y={ranges[1]:.3f}, Z={ranges[2]:.3f}")
+            logger.debug("校正后包围盒: X=[%.3f, %.3f], Y=[%.3f, %.3f], Z=[%.3f, %.3f]",
+                         min_coords[0], max_coords[0], min_coords[1], max_coords[1], min_coords[2], max_coords[2])
+            logger.debug("校正后各轴范围: X=%.3f, Y=%.3f, Z=%.3f", ranges[0], ranges[1], ranges[2])
             
-            # 检查地面是否水平（使用最低点检测）
-            z_values = combined_corrected[:, 2]
-            z_min = np.min(z_values)
-            height_tolerance = ranges[2] * 0.05
-            ground_mask = z_values <= (z_min + height_tolerance)
+            # 检查地面是否水平（沿向上轴使用最低点检测，-Y 时取最高点）
+            _, height_axis, axis_sign, _ = axis_spec
+            height_values = combined_corrected[:, height_axis]
+            height_tolerance = ranges[height_axis] * 0.05
+            if axis_sign < 0:
+                ground_mask = height_values >= (max_coords[height_axis] - height_tolerance)
+            else:
+                ground_mask = height_values <= (min_coords[height_axis] + height_tolerance)
             ground_points = combined_corrected[ground_mask]
             
             if len(ground_points) >= 10:
@@ -846,43 +957,38 @@ class GLBPointCloudRotationCorrector:
                     centroid = np.mean(ground_points, axis=0)
                     centered_points = ground_points - centroid
                     
-                    # 使用少量点进行SVD避免内存问题
-                    if len(centered_points) > 1000:
-                        sample_indices = np.random.choice(len(centered_points), 1000, replace=False)
-                        centered_points = centered_points[sample_indices]
-                    
-                    U, S, Vt = np.linalg.svd(centered_points)
-                    corrected_normal = Vt[-1]
+                    # 3x3协方差矩阵的最小特征值对应的特征向量即为地面法向量，使用全部地面点
+                    _, eigenvectors = np.linalg.eigh(centered_points.T @ centered_points)
+                    corrected_normal = eigenvectors[:, 0]
                     
-                    # 确保法向量向上
-                    if corrected_normal[2] < 0:
+                    # 确保法向量与向上轴同向
+                    if axis_sign * corrected_normal[height_axis] < 0:
                         corrected_normal = -corrected_normal
                     
-                    # 计算与垂直方向的夹角
-                    vertical_angle = np.arccos(np.clip(corrected_normal[2], -1.0, 1.0))
+                    # 计算与向上轴的夹角
+                    vertical_angle = np.arccos(np.clip(axis_sign * corrected_normal[height_axis], -1.0, 1.0))
                     
-                    processing_log.append(f"校正后地面法向量: [{corrected_normal[0]:.4f}, {corrected_normal[1]:.4f}, {corrected_normal[2]:.4f}]")
-                    processing_log.append(f"校正后地面与水平面夹角: {np.degrees(vertical_angle):.2f} 度")
+                    logger.debug("校正后地面法向量: [%.4f, %.4f, %.4f]", *corrected_normal)
+                    logger.debug("校正后地面与水平面夹角: %.2f 度", np.degrees(vertical_angle))
                     
                     if np.degrees(vertical_angle) < 5.0:
-                        processing_log.append("✓ 校正成功：地面已接近水平")
+                        logger.debug("✓ 校正成功：地面已接近水平")
                     else:
-                        processing_log.append(f"⚠ 校正可能不完全：地面仍有 {np.degrees(vertical_angle):.1f} 度倾斜")
+                        logger.debug("⚠ 校正可能不完全：地面仍有 %.1f 度倾斜", np.degrees(vertical_angle))
                     
                 except Exception as e:
-                    processing_log.append(f"校正验证失败: {str(e)}")
+                    logger.debug("校正验证失败: %s", e)
             else:
-                processing_log.append("校正验证：地面点不足，无法验证")
+                logger.debug("校正验证：地面点不足，无法验证")
         else:
-            processing_log.append("校正验证：没有找到顶点数据")
+            logger.debug("校正验证：没有找到顶点数据")
     
     def _add_reference_planes(self, scene, original_vertices, ground_normal, ground_point, 
                             rotation_matrix, plane_size, processing_log):
         """添加参考平面可视化"""
         
         # 计算平面尺寸
-        bbox_min = np.min(original_vertices, axis=0)
-        bbox_max = np.max(original_vertices, axis=0)
+        bbox_min, bbox_max = _vertex_bounds(original_vertices)
         bbox_size = bbox_max - bbox_min
         plane_extent = np.max(bbox_size[:2]) * plane_size / 2  # 只考虑XY尺寸
         
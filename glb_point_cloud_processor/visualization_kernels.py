@@ -0,0 +1,73 @@
+from .common import *
+
+# 可视化点云生成的numba内核（可选）：直接写入预分配的输出缓冲区，
+# numba不可用或编译失败时 viz_kernels_available() 返回 False，调用方使用numpy实现
+
+if NUMBA_AVAILABLE:
+    @numba.njit(parallel=True, fastmath=True, cache=True)
+    def edge_points_kernel(edge_starts, edge_ends, density, out):
+        """在每条边上等距插值 density 个点，写入 out[(边数*density), 3]"""
+        for e in numba.prange(edge_starts.shape[0]):
+            for i in range(density):
+                t = i / (density - 1) if density > 1 else 0.0
+                row = e * density + i
+                for d in range(3):
+                    out[row, d] = edge_starts[e, d] + t * (edge_ends[e, d] - edge_starts[e, d])
+
+    @numba.njit(parallel=True, fastmath=True, cache=True)
+    def sphere_points_kernel(centers, uniforms, radius, out):
+        """根据[0,1)均匀随机数 uniforms[(中心数, 每中心点数, 3)] 在每个中心周围的球内采样"""
+        count = uniforms.shape[1]
+        for c in numba.prange(centers.shape[0]):
+            for i in range(count):
+                theta = uniforms[c, i, 0] * 2.0 * np.pi
+                phi = uniforms[c, i, 1] * np.pi
+                r = uniforms[c, i, 2] * radius
+                r_sin_phi = r * np.sin(phi)
+                row = c * count + i
+                out[row, 0] = centers[c, 0] + r_sin_phi * np.cos(theta)
+                out[row, 1] = centers[c, 1] + r_sin_phi * np.sin(theta)
+                out[row, 2] = centers[c, 2] + r * np.cos(phi)
+
+    @numba.njit(parallel=True, fastmath=True, cache=True)
+    def axis_line_points_kernel(origin, axis, other_axis_0, other_axis_1, t, axis_length,
+                                offsets_0, offsets_1, out):
+        """生成单个坐标轴的粗线条点：每个采样点为主轴线点加垂直平面上的厚度网格点"""
+        block = 1 + offsets_0.shape[0]
+        for i in numba.prange(t.shape[0]):
+            axis_value = origin[axis] + t[i] * axis_length
+            for q in range(block):
+                row = i * block + q
+                out[row, 0] = origin[0]
+                out[row, 1] = origin[1]
+                out[row, 2] = origin[2]
+                out[row, axis] = axis_value
+                if q > 0:
+                    out[row, other_axis_0] += offsets_0[q - 1]
+                    out[row, other_axis_1] += offsets_1[q - 1]
+
+    _f32 = np.float32
+
+    def _warm_up_viz_kernels():
+        """以最小输入调用各内核，触发编译或加载编译缓存"""
+        edge_points_kernel(np.zeros((1, 3), _f32), np.ones((1, 3), _f32), 2, np.empty((2, 3), _f32))
+        sphere_points_kernel(np.zeros((1, 3), _f32), np.zeros((1, 1, 3), _f32), _f32(1.0), np.empty((1, 3), _f32))
+        axis_line_points_kernel(np.zeros(3, _f32), 0, 1, 2, np.zeros(1, _f32), _f32(1.0), np.zeros(1, _f32),
+                                np.zeros(1, _f32), np.empty((2, 3), _f32))
+
+
+# 内核在首次生成可视化时才预热，不拖慢节点导入（cache=True时直接加载磁盘上的编译缓存）；None表示尚未预热
+_VIZ_KERNELS_READY = None if NUMBA_AVAILABLE else False
+
+
+def viz_kernels_available():
+    """首次调用时预热可视化numba内核并记录结果，返回内核是否可用；编译失败时调用方使用numpy实现"""
+    global _VIZ_KERNELS_READY
+    if _VIZ_KERNELS_READY is None:
+        try:
+            _warm_up_viz_kernels()
+            _VIZ_KERNELS_READY = True
+        except Exception as e:
+            logger.warning(f"可视化numba内核编译失败，回退到numpy实现: {e}")
+            _VIZ_KERNELS_READY = False
+    return _VIZ_KERNELS_READY